@@ -6,9 +6,20 @@ A PyQt6-based database interface for DuckDB with file loading capabilities
 
 import sys
 import os
+import re
+import time
+import datetime
+import hashlib
+import pickle
+import itertools
+import queue
+import functools
 import traceback
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import contextmanager, suppress
+from typing import Optional, Dict, Any, List, Iterator
 
 try:
     import polars as pl
@@ -17,6 +28,16 @@ except ImportError:
     POLARS_AVAILABLE = False
     print("Polars not available, folder loading feature will be disabled")
 
+try:
+    import fastexcel  # noqa: F401 - backs Polars' Rust-based calamine Excel engine
+    FASTEXCEL_AVAILABLE = True
+except ImportError:
+    FASTEXCEL_AVAILABLE = False
+    print("fastexcel not available, using Polars' default Excel engine")
+
+# Extra keyword arguments for every pl.read_excel call
+EXCEL_READ_OPTIONS = {'engine': 'calamine'} if FASTEXCEL_AVAILABLE else {}
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QSplitter, QTreeWidget, QTreeWidgetItem, QTextEdit, QTableWidget,
@@ -26,8 +47,10 @@ from PyQt6.QtWidgets import (
     QCheckBox, QSpinBox, QDialogButtonBox, QComboBox, QGroupBox, QInputDialog,
     QCompleter
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings, QStringListModel
-from PyQt6.QtGui import QAction, QIcon, QFont, QPixmap, QClipboard
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QTimer, QSettings, QStringListModel, QObject, QRunnable, QThreadPool, QUrl
+)
+from PyQt6.QtGui import QAction, QIcon, QFont, QPixmap, QClipboard, QDesktopServices
 
 try:
     from PyQt6.Qsci import QsciScintilla, QsciLexerSQL
@@ -38,12 +61,197 @@ except ImportError:
 
 import duckdb
 import polars as pl
+import pyarrow as pa
 import threading
 import webbrowser
-from flask import Flask, jsonify, request, send_from_directory
 import json
 
 
+# Smallest size a real .xlsx/.xls workbook can have; anything below is skipped by the folder loaders
+MIN_EXCEL_FILE_BYTES = 128
+
+# Seconds an attached database's table/column listing is reused before it is fetched again
+SCHEMA_TTL = 60.0
+
+# Rows per Arrow record batch when streaming Polars frames into DuckDB
+ARROW_INGEST_BATCH_ROWS = 100_000
+
+# Rows per Arrow record batch when streaming a full query result to an export file
+EXPORT_BATCH_ROWS = 100_000
+
+# Milliseconds log messages are batched before being appended to the messages log
+LOG_FLUSH_INTERVAL_MS = 50
+
+# Seconds the connection save thread waits for further changes before writing them all at once
+SETTINGS_SAVE_COALESCE_SECS = 0.2
+
+# Table names are interpolated into DDL, so they must be plain identifiers;
+# every other literal (paths, delimiters, options) is bound as a parameter
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Statements that can change the schema tree, matched after any leading comments are stripped
+_DDL_RE = re.compile(r'^\s*(CREATE|DROP|ALTER|TRUNCATE|RENAME|COMMENT)\b', re.I)
+_SELECT_RE = re.compile(r'^\s*(SELECT|WITH|FROM|VALUES|TABLE)\b', re.I)
+_LEADING_COMMENTS_RE = re.compile(r'^(?:\s*(?:--[^\n]*(?:\n|$)|/\*.*?\*/))*', re.S)
+
+# Client-side USE statements and the message reporting a context switch
+_CTX_RE = re.compile(r"Database context switched to '([^']+)'")
+_USE_RE = re.compile(r'^\s*USE\s+([A-Za-z_][\w$.]*)\s*$', re.I)
+
+# MySQL system tables that are hidden from the database tree
+_SYS_TBL_RE = re.compile(r'^(?:INNODB|PERFORMANCE|SYS)_', re.I)
+
+# Catalog queries for the database tree. DuckDB's duckdb_*() functions iterate the in-memory
+# catalog of every attached database directly, so the database and optional schema are bound
+# values and the SQL text never changes
+_Q_LOCAL_COLS = (
+    "SELECT table_name, column_name, data_type FROM duckdb_columns() "
+    "WHERE database_name = current_database() AND schema_name = 'local' "
+    "ORDER BY table_name, column_index"
+)
+_Q_SCHEMAS = (
+    "SELECT schema_name FROM duckdb_schemas() WHERE database_name = ? AND NOT internal "
+    "ORDER BY schema_name"
+)
+_Q_TABLES = (
+    "SELECT schema_name, table_name FROM duckdb_tables() "
+    "WHERE database_name = $1 AND schema_name = coalesce($2, schema_name) AND NOT internal "
+    "UNION ALL "
+    "SELECT schema_name, view_name FROM duckdb_views() "
+    "WHERE database_name = $1 AND schema_name = coalesce($2, schema_name) AND NOT internal "
+    "ORDER BY 1, 2"
+)
+_Q_COLS = (
+    "SELECT schema_name, table_name, column_name, data_type FROM duckdb_columns() "
+    "WHERE database_name = ? AND schema_name = coalesce(?, schema_name) AND NOT internal "
+    "ORDER BY schema_name, table_name, column_index"
+)
+
+
+_DUCKDB_TYPE_KEY = b'duckdb_type'  # Field metadata naming a DuckDB type that Arrow alone cannot tell apart
+_TAGGED_DUCKDB_TYPES = ('HUGEINT', 'UHUGEINT', 'BIT')
+
+
+def duckdb_result_schema(schema, description):
+    """Return schema with HUGEINT/UHUGEINT/BIT columns tagged in field metadata from a cursor description"""
+    fields = []
+    for field, column_description in zip(schema, description):
+        type_name = str(column_description[1])
+        if type_name in _TAGGED_DUCKDB_TYPES:
+            field = field.with_metadata({_DUCKDB_TYPE_KEY: type_name.encode()})
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _column_pylist(column, field=None) -> list:
+    """Convert an Arrow column to the Python values DuckDB's fetchall() would have returned"""
+    arrow_type = column.type
+    duckdb_type = (field.metadata or {}).get(_DUCKDB_TYPE_KEY) if field is not None else None
+    if duckdb_type == b'BIT':
+        # DuckDB stores BIT as a padding-count byte followed by the bits; fetchall() gives them as '0'/'1' text
+        return [
+            None if value is None else ''.join(f"{byte:08b}" for byte in value[1:])[value[0]:]
+            for value in column.to_pylist()
+        ]
+    if duckdb_type in (b'HUGEINT', b'UHUGEINT'):
+        # HUGEINT/UHUGEINT arrive as DECIMAL(38,0); fetchall() gives a plain int
+        return [None if value is None else int(value) for value in column.to_pylist()]
+    if pa.types.is_interval(arrow_type):
+        # DuckDB hands INTERVAL to Arrow as month/day/nano; fetchall() gives a timedelta with 30-day months
+        return [
+            None if value is None else
+            datetime.timedelta(days=value.months * 30 + value.days, microseconds=value.nanoseconds // 1000)
+            for value in column.to_pylist()
+        ]
+    # MAP values, including ones nested in lists and structs, come back as dicts like fetchall()'s
+    return column.to_pylist(maps_as_pydicts='lossy')
+
+
+def result_columns(data) -> List[list]:
+    """Return query result data (an Arrow table or record batch, or a list of rows) as one Python list per column"""
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return [_column_pylist(column, field) for field, column in zip(data.schema, data.columns)]
+    return [list(column) for column in zip(*data)]
+
+
+def iter_result_rows(data):
+    """Iterate query result data (an Arrow table or record batch, or a list of rows) as row tuples"""
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return zip(*result_columns(data))
+    return iter(data)
+
+
+def _needs_text_export(arrow_type) -> bool:
+    """Whether flat-file writers (Arrow's CSV writer, xlsxwriter) cannot take a column type as is"""
+    return (pa.types.is_nested(arrow_type) or pa.types.is_interval(arrow_type)
+            or pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type))
+
+
+def text_export_schema(schema):
+    """Return schema with the types flat-file writers cannot handle replaced by strings"""
+    return pa.schema([
+        pa.field(field.name, pa.string()) if _needs_text_export(field.type) else field
+        for field in schema
+    ])
+
+
+def text_export_batch(batch):
+    """Render LIST/STRUCT/MAP, INTERVAL and BLOB columns of a record batch as the text the results grid shows"""
+    if not any(_needs_text_export(field.type) for field in batch.schema):
+        return batch
+    columns = [
+        pa.array([None if value is None else str(value) for value in _column_pylist(column, field)], type=pa.string())
+        if _needs_text_export(field.type) else column
+        for field, column in zip(batch.schema, batch.columns)
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=text_export_schema(batch.schema))
+
+
+def _q(ident: str) -> str:
+    """Quote an identifier for interpolation into SQL, doubling any embedded double quotes"""
+    return '"' + ident.replace('"', '""') + '"'
+
+
+def _iter_statements(sql: str) -> Iterator[str]:
+    """Yield the statements of a script, splitting on semicolons outside quotes and comments"""
+    in_squote = in_dquote = in_line_comment = in_block_comment = False
+    start = 0
+    i = 0
+    n = len(sql)
+    while i < n:
+        ch = sql[i]
+        if in_line_comment:
+            if ch == '\n':
+                in_line_comment = False
+        elif in_block_comment:
+            if ch == '*' and sql.startswith('/', i + 1):
+                in_block_comment = False
+                i += 1
+        elif in_squote:
+            # A doubled '' inside a string closes and reopens it, which leaves the state unchanged
+            if ch == "'":
+                in_squote = False
+        elif in_dquote:
+            if ch == '"':
+                in_dquote = False
+        elif ch == "'":
+            in_squote = True
+        elif ch == '"':
+            in_dquote = True
+        elif ch == '-' and sql.startswith('-', i + 1):
+            in_line_comment = True
+            i += 1
+        elif ch == '/' and sql.startswith('*', i + 1):
+            in_block_comment = True
+            i += 1
+        elif ch == ';':
+            yield sql[start:i]
+            start = i + 1
+        i += 1
+    if start < n:
+        yield sql[start:]
+
+
 class DatabaseConnection:
     """Represents a database connection configuration"""
     
@@ -63,6 +271,7 @@ class DatabaseConnection:
         self.ssl_ca = ssl_ca
         self.connection = None
         self.is_connected = False
+        self.default_schema = ''  # First database of a server-level connection, found on first connect
 
 
 class DatabaseConnectionManager:
@@ -71,12 +280,20 @@ class DatabaseConnectionManager:
     def __init__(self, main_connection):
         self.main_connection = main_connection  # DuckDB main connection
         self.connections = {}  # Dict of connection_name -> DatabaseConnection
+        self._lock = threading.Lock()  # Guards self.connections against the save thread
+        self._dsn_schemas: Dict[tuple, List[str]] = {}  # (host, port, username) -> databases on that server
         self.settings = QSettings('DuckDBGUI', 'Connections')
         self.load_connections()
+        
+        # Saves are queued and written by a background thread, so edits never wait on the settings file
+        self._save_queue = queue.Queue()
+        self._save_thread = threading.Thread(target=self._save_worker, daemon=True)
+        self._save_thread.start()
     
     def add_connection(self, connection: DatabaseConnection):
         """Add a new database connection"""
-        self.connections[connection.name] = connection
+        with self._lock:
+            self.connections[connection.name] = connection
         self.save_connections()
     
     def add_connection(self, name: str, host: str, port: int, database: str = '', 
@@ -89,16 +306,35 @@ class DatabaseConnectionManager:
             database=database, username=username, password=password,
             use_ssl=use_ssl, ssl_cert=ssl_cert, ssl_key=ssl_key, ssl_ca=ssl_ca
         )
-        self.connections[name] = connection
+        with self._lock:
+            self.connections[name] = connection
         self.save_connections()
     
+    def rename_connection(self, old_name: str, connection: DatabaseConnection) -> bool:
+        """Replace the connection stored under old_name with one under a new name; False if that name is taken"""
+        # Detach first; disconnect_database does not take the lock, so it cannot run inside it
+        old = self.connections.get(old_name)
+        if old and old.is_connected and connection.name not in self.connections:
+            self.disconnect_database(old_name)
+        
+        # Check and swap in one locked step so no other writer can claim the name in between,
+        # and the save thread never sees both names, or neither
+        with self._lock:
+            if connection.name in self.connections:
+                return False
+            self.connections.pop(old_name, None)
+            self.connections[connection.name] = connection
+        self.save_connections()
+        return True
+    
     def remove_connection(self, name: str):
         """Remove a database connection"""
         if name in self.connections:
             conn = self.connections[name]
             if conn.is_connected:
                 self.disconnect_database(name)
-            del self.connections[name]
+            with self._lock:
+                del self.connections[name]
             self.save_connections()
     
     def connect_database(self, name: str) -> bool:
@@ -130,7 +366,7 @@ class DatabaseConnectionManager:
                         conn_str += f" sslkey={conn.ssl_key}"
                 
                 # Attach the database using TYPE mysql syntax
-                self.main_connection.execute(f"ATTACH '{conn_str}' AS {conn.name} (TYPE mysql)")
+                self.main_connection.execute(f"ATTACH '{conn_str}' AS {_q(conn.name)} (TYPE mysql)")
                 conn.is_connected = True
                 return True
                 
@@ -145,7 +381,7 @@ class DatabaseConnectionManager:
         if name in self.connections:
             conn = self.connections[name]
             try:
-                self.main_connection.execute(f"DETACH {name}")
+                self.main_connection.execute(f"DETACH {_q(name)}")
                 conn.is_connected = False
             except Exception as e:
                 print(f"Error disconnecting {name}: {e}")
@@ -158,23 +394,71 @@ class DatabaseConnectionManager:
         """Get list of connected database names"""
         return [name for name, conn in self.connections.items() if conn.is_connected]
     
+    def get_dsn_schemas(self, conn: DatabaseConnection) -> Optional[List[str]]:
+        """Return the databases already listed for the server behind conn, or None"""
+        return self._dsn_schemas.get((conn.host, conn.port, conn.username))
+    
+    def set_dsn_schemas(self, conn: DatabaseConnection, schemas: List[str]):
+        """Remember the databases listed for the server behind conn, for sibling connections"""
+        self._dsn_schemas[(conn.host, conn.port, conn.username)] = schemas
+    
+    def forget_dsn_schemas(self, name: str):
+        """Drop the remembered database list for a connection's server"""
+        conn = self.connections.get(name)
+        if conn:
+            self._dsn_schemas.pop((conn.host, conn.port, conn.username), None)
+    
     def save_connections(self):
+        """Queue the connections to be saved to QSettings by the save thread"""
+        self._save_queue.put(True)
+    
+    def close(self):
+        """Write any queued save and stop the save thread"""
+        self._save_queue.put(False)
+        self._save_thread.join()
+    
+    def _save_worker(self):
+        """Write queued saves, coalescing requests that arrive within SETTINGS_SAVE_COALESCE_SECS"""
+        # QSettings is reentrant, not thread-safe, so this thread writes through its own instance
+        settings = QSettings('DuckDBGUI', 'Connections')
+        running = True
+        while running:
+            running = self._save_queue.get()
+            deadline = time.monotonic() + SETTINGS_SAVE_COALESCE_SECS
+            while running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    running = self._save_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            try:
+                self._write_connections(settings)
+            except Exception as e:
+                print(f"Error saving connections: {e}")
+    
+    def _write_connections(self, settings: QSettings):
         """Save connections to QSettings"""
-        self.settings.beginWriteArray("connections")
-        for i, (name, conn) in enumerate(self.connections.items()):
-            self.settings.setArrayIndex(i)
-            self.settings.setValue("name", conn.name)
-            self.settings.setValue("db_type", conn.db_type)
-            self.settings.setValue("host", conn.host)
-            self.settings.setValue("port", conn.port)
-            self.settings.setValue("database", conn.database)
-            self.settings.setValue("username", conn.username)
-            self.settings.setValue("password", conn.password)  # Save password
-            self.settings.setValue("use_ssl", conn.use_ssl)
-            self.settings.setValue("ssl_cert", conn.ssl_cert)
-            self.settings.setValue("ssl_key", conn.ssl_key)
-            self.settings.setValue("ssl_ca", conn.ssl_ca)
-        self.settings.endArray()
+        with self._lock:
+            connections = list(self.connections.values())
+        settings.beginWriteArray("connections")
+        for i, conn in enumerate(connections):
+            settings.setArrayIndex(i)
+            settings.setValue("name", conn.name)
+            settings.setValue("db_type", conn.db_type)
+            settings.setValue("host", conn.host)
+            settings.setValue("port", conn.port)
+            settings.setValue("database", conn.database)
+            settings.setValue("username", conn.username)
+            settings.setValue("password", conn.password)  # Save password
+            settings.setValue("use_ssl", conn.use_ssl)
+            settings.setValue("ssl_cert", conn.ssl_cert)
+            settings.setValue("ssl_key", conn.ssl_key)
+            settings.setValue("ssl_ca", conn.ssl_ca)
+        settings.endArray()
+        # One flush per coalesced batch; QSettings writes the file atomically
+        settings.sync()
     
     def load_connections(self):
         """Load connections from QSettings"""
@@ -491,30 +775,8 @@ class CSVImportDialog(QDialog):
             temp_conn = duckdb.connect(preview_db_file)
             
             # Build the read_csv query based on settings
-            delimiter = self.get_delimiter_value()
-            quote_char = self.get_quote_value()
-            
-            if delimiter is None:
-                # Use auto-detection
-                query = f"SELECT * FROM read_csv_auto('{self.file_path}') LIMIT 5"
-            else:
-                # Use specific settings
-                params = []
-                params.append(f"delimiter='{delimiter}'")
-                
-                if not self.header_check.isChecked():
-                    params.append("header=false")
-                    
-                if quote_char is not None:
-                    if quote_char == "":
-                        params.append("quote=''")
-                    else:
-                        params.append(f"quote='{quote_char}'")
-                        
-                params_str = ", " + ", ".join(params) if params else ""
-                query = f"SELECT * FROM read_csv('{self.file_path}'{params_str}) LIMIT 5"
-            
-            result = temp_conn.execute(query).fetchall()
+            select_sql, params = self.get_csv_select()
+            result = temp_conn.execute(f"{select_sql} LIMIT 5", params).fetchall()
             columns = [desc[0] for desc in temp_conn.description]
             
             # Update preview table
@@ -546,56 +808,26 @@ class CSVImportDialog(QDialog):
             self.preview_table.setRowCount(1)
             self.preview_table.setItem(0, 0, error_item)
             
-    def get_csv_query(self, table_name: str):
-        """Generate the appropriate CSV loading query based on settings"""
+    def get_csv_options(self) -> dict:
+        """Return the read_csv options pinned by the current settings; empty when everything is auto-detected"""
         delimiter = self.get_delimiter_value()
-        quote_char = self.get_quote_value()
-        
         if delimiter is None:
-            # Use auto-detection
-            return f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{self.file_path}')"
-        else:
-            # Use specific settings
-            params = []
-            params.append(f"delimiter='{delimiter}'")
-            
-            if not self.header_check.isChecked():
-                params.append("header=false")
-                
-            if quote_char is not None:
-                if quote_char == "":
-                    params.append("quote=''")
-                else:
-                    params.append(f"quote='{quote_char}'")
-                    
-            params_str = ", " + ", ".join(params) if params else ""
-            return f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv('{self.file_path}'{params_str})"
-    
-    def get_csv_query_as_text(self, table_name: str):
-        """Generate CSV loading query with all columns as text (VARCHAR)"""
-        delimiter = self.get_delimiter_value()
-        quote_char = self.get_quote_value()
+            return {}
         
-        if delimiter is None:
-            # Use auto-detection with all columns as text
-            return f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{self.file_path}', ALL_VARCHAR=true)"
-        else:
-            # Use specific settings with all columns as text
-            params = []
-            params.append(f"delimiter='{delimiter}'")
-            params.append("ALL_VARCHAR=true")
-            
-            if not self.header_check.isChecked():
-                params.append("header=false")
-                
-            if quote_char is not None:
-                if quote_char == "":
-                    params.append("quote=''")
-                else:
-                    params.append(f"quote='{quote_char}'")
-                    
-            params_str = ", " + ", ".join(params) if params else ""
-            return f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv('{self.file_path}'{params_str})"
+        # Use specific settings
+        options = {'delim': delimiter}
+        if not self.header_check.isChecked():
+            options['header'] = False
+        quote_char = self.get_quote_value()
+        if quote_char is not None:
+            options['quote'] = quote_char  # '' turns quoting off
+        return options
+    
+    def get_csv_select(self):
+        """Return (SELECT over read_csv, parameters) for the current settings; the path and options are bound"""
+        options = self.get_csv_options()
+        option_args = "".join(f", {key}=?" for key in options)
+        return f"SELECT * FROM read_csv(?{option_args})", [self.file_path, *options.values()]
 
 
 class ExcelImportDialog(QDialog):
@@ -685,9 +917,9 @@ class ExcelImportDialog(QDialog):
             
             # Read Excel file with specified sheet
             if sheet_name:
-                df = pl.read_excel(self.file_path, sheet_name=sheet_name)
+                df = pl.read_excel(self.file_path, sheet_name=sheet_name, **EXCEL_READ_OPTIONS)
             else:
-                df = pl.read_excel(self.file_path)  # First sheet by default
+                df = pl.read_excel(self.file_path, **EXCEL_READ_OPTIONS)  # First sheet by default
             
             # Limit preview to first 5 rows
             preview_df = df.head(5)
@@ -789,9 +1021,9 @@ class DatabaseConnectionDialog(QDialog):
         self.ssl_cert_btn = QPushButton("Browse...")
         self.ssl_key_btn = QPushButton("Browse...")
         
-        self.ssl_ca_btn.clicked.connect(lambda: self.browse_file(self.ssl_ca_edit, "CA Certificate"))
-        self.ssl_cert_btn.clicked.connect(lambda: self.browse_file(self.ssl_cert_edit, "Client Certificate"))
-        self.ssl_key_btn.clicked.connect(lambda: self.browse_file(self.ssl_key_edit, "Client Key"))
+        self.ssl_ca_btn.clicked.connect(functools.partial(self.browse_file, self.ssl_ca_edit, "CA Certificate"))
+        self.ssl_cert_btn.clicked.connect(functools.partial(self.browse_file, self.ssl_cert_edit, "Client Certificate"))
+        self.ssl_key_btn.clicked.connect(functools.partial(self.browse_file, self.ssl_key_edit, "Client Key"))
         
         ssl_layout.addRow(self.use_ssl_check)
         
@@ -930,14 +1162,14 @@ class DatabaseConnectionDialog(QDialog):
             
             # Test the connection by trying to attach
             test_db_name = f"test_{conn_data.name}"
-            test_conn.execute(f"ATTACH '{conn_str}' AS {test_db_name} (TYPE mysql)")
+            test_conn.execute(f"ATTACH '{conn_str}' AS {_q(test_db_name)} (TYPE mysql)")
             
             # Try a simple query to verify connection
             # Use a basic query that works regardless of database specification
             result = test_conn.execute(f"SELECT 1").fetchone()
             
             # Clean up
-            test_conn.execute(f"DETACH {test_db_name}")
+            test_conn.execute(f"DETACH {_q(test_db_name)}")
             test_conn.close()
             
             # Remove temporary test database file
@@ -988,6 +1220,7 @@ class ThemeManager:
     def __init__(self):
         self.settings = QSettings('DuckDBGUI', 'Themes')
         self.current_theme = self.settings.value('current_theme', 'light')
+        self._stylesheets = {}  # Maps theme name to its built stylesheet
         
     def get_themes(self):
         """Get available theme names"""
@@ -995,13 +1228,18 @@ class ThemeManager:
         
     def get_theme_stylesheet(self, theme_name):
         """Get stylesheet for a specific theme"""
-        themes = {
-            'light': self._get_light_theme(),
-            'dark': self._get_dark_theme(),
-            'blue': self._get_blue_theme(),
-            'green': self._get_green_theme()
-        }
-        return themes.get(theme_name, themes['light'])
+        stylesheet = self._stylesheets.get(theme_name)
+        if stylesheet is None:
+            # Build only the requested theme, once; unknown names fall back to light
+            themes = {
+                'light': self._get_light_theme,
+                'dark': self._get_dark_theme,
+                'blue': self._get_blue_theme,
+                'green': self._get_green_theme
+            }
+            stylesheet = themes.get(theme_name, themes['light'])()
+            self._stylesheets[theme_name] = stylesheet
+        return stylesheet
         
     def _get_light_theme(self):
         """Light theme stylesheet"""
@@ -1374,6 +1612,17 @@ class QueryWorker(QThread):
                     query = query[:match.start()] + replacement + query[match.end():]
         
         return query
+    
+    def fetch_result(self, query):
+        """Execute a query and return (arrow_table, columns), kept column-major straight from DuckDB"""
+        self.connection.execute(query)
+        if self.connection.description is None:
+            # Statements without a result set
+            return pa.table({}), []
+        description = self.connection.description
+        result = self.connection.to_arrow_table()
+        result = pa.Table.from_arrays(result.columns, schema=duckdb_result_schema(result.schema, description))
+        return result, result.column_names
         
     def run(self):
         try:
@@ -1381,6 +1630,7 @@ class QueryWorker(QThread):
             
             # Preprocess the query to handle database context
             processed_query = self.preprocess_query(self.query)
+            self.processed_query = processed_query
             
             # Check if query is a SELECT statement that can be paginated
             query_upper = processed_query.strip().upper()
@@ -1397,8 +1647,7 @@ class QueryWorker(QThread):
                 except:
                     # If count fails, fall back to non-paginated query
                     total_count = -1
-                    result = self.connection.execute(processed_query).fetchall()
-                    columns = [desc[0] for desc in self.connection.description]
+                    result, columns = self.fetch_result(processed_query)
                     self.finished.emit((result, columns), self.query, total_count)
                     return
                 
@@ -1418,20 +1667,94 @@ class QueryWorker(QThread):
                     # Add LIMIT and OFFSET to the original query
                     paginated_query = f"{clean_query} LIMIT {self.page_size} OFFSET {offset}"
                 
-                result = self.connection.execute(paginated_query).fetchall()
-                columns = [desc[0] for desc in self.connection.description]
+                result, columns = self.fetch_result(paginated_query)
                 self.finished.emit((result, columns), self.query, total_count)
             else:
                 # Non-SELECT queries or when pagination is disabled
-                result = self.connection.execute(processed_query).fetchall()
-                columns = [desc[0] for desc in self.connection.description]
-                total_count = len(result) if result else 0
+                result, columns = self.fetch_result(processed_query)
+                total_count = len(result)
                 self.finished.emit((result, columns), self.query, total_count)
                 
         except Exception as e:
             self.error.emit(str(e))
 
 
+class ExportWorkerSignals(QObject):
+    """Signals emitted by ExportWorker; QRunnable itself cannot carry signals"""
+    finished = pyqtSignal(str)  # Success message
+    error = pyqtSignal(str)  # Error message
+
+
+class ExportWorker(QRunnable):
+    """Thread-pool task that writes query results to an export file"""
+    
+    def __init__(self, write_export, file_path, results_data, full_result, label, missing_dependency_msg=None):
+        super().__init__()
+        self.signals = ExportWorkerSignals()
+        self.write_export = write_export
+        self.file_path = file_path
+        self.results_data = results_data
+        self.full_result = full_result
+        self.label = label
+        self.missing_dependency_msg = missing_dependency_msg
+        
+    def run(self):
+        try:
+            self.write_export(self.file_path, self.results_data, self.full_result)
+            self.signals.finished.emit(self.file_path)
+        except ImportError as e:
+            self.signals.error.emit(self.missing_dependency_msg or f"Error exporting to {self.label}: {str(e)}")
+        except Exception as e:
+            self.signals.error.emit(f"Error exporting to {self.label}: {str(e)}")
+
+
+class WebServerWorker(QThread):
+    """Worker thread that serves the PivotJS web app until stop() is called"""
+    error = pyqtSignal(str)  # Error message if the server loop fails
+    
+    def __init__(self, serve, stop):
+        super().__init__()
+        self._serve = serve
+        self._stop = stop
+        
+    def run(self):
+        """Run the server loop; it returns once stop() shuts the server down"""
+        try:
+            self._serve()
+        except Exception as e:
+            self.error.emit(f"Web server stopped: {str(e)}")
+    
+    def stop(self):
+        """Shut the server down; follow with wait() to let run() return"""
+        try:
+            self._stop()
+        except Exception as e:
+            print(f"Error stopping web server: {e}")
+
+
+class SchemaRefreshWorker(QThread):
+    """Worker thread for reading table and column listings for the database tree"""
+    finished = pyqtSignal(object, object)  # Schema plan, error messages
+    
+    def __init__(self, connection, databases, collect_plan):
+        super().__init__()
+        self.connection = connection
+        self.databases = databases
+        self.collect_plan = collect_plan
+        
+    def run(self):
+        """Collect the schema plan on a cursor of its own so the GUI connection stays free"""
+        try:
+            cursor = self.connection.cursor()
+            try:
+                plan, errors = self.collect_plan(cursor, self.databases)
+            finally:
+                cursor.close()
+        except Exception as e:
+            plan, errors = None, [f"Error refreshing database tree: {e}"]
+        self.finished.emit(plan, errors)
+
+
 class DatabaseTreeWidget(QTreeWidget):
     """Custom tree widget for database objects"""
     
@@ -1440,6 +1763,8 @@ class DatabaseTreeWidget(QTreeWidget):
         self.parent_gui = parent
         self.setHeaderLabel("Database Objects")
         self.setMinimumWidth(250)
+        # Every row is a single line of text, so Qt can skip per-row height measurement
+        self.setUniformRowHeights(True)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         self.setup_tree()
@@ -1497,21 +1822,39 @@ class DatabaseTreeWidget(QTreeWidget):
         self.table_nodes[database].addChild(table_item)
         # Keep collapsed by default - don't expand
         
-    def remove_database(self, db_name: str):
-        """Remove a database from the tree"""
-        if db_name in self.database_nodes and db_name != 'local':
-            # Remove the source node (which contains the database)
-            if db_name in self.source_nodes:
-                self.takeTopLevelItem(self.indexOfTopLevelItem(self.source_nodes[db_name]))
-                del self.source_nodes[db_name]
-            
-            # Clean up all related nodes
-            if db_name in self.database_nodes:
-                del self.database_nodes[db_name]
-            if db_name in self.table_nodes:
-                del self.table_nodes[db_name]
-            if db_name in self.view_nodes:
-                del self.view_nodes[db_name]
+    def set_tables(self, database: str, tables: Dict[str, List[str]]):
+        """Replace the tables under a database's Tables node, adding items in bulk"""
+        tables_node = self.table_nodes[database]
+        tables_node.takeChildren()
+        
+        table_items = []
+        for table_name, columns in tables.items():
+            table_item = QTreeWidgetItem([table_name])
+            table_item.setData(0, Qt.ItemDataRole.UserRole, database)  # Store database name
+            # Columns are attached while the table item is still detached from the tree
+            table_item.addChildren([QTreeWidgetItem([col]) for col in columns or ()])
+            table_items.append(table_item)
+        
+        tables_node.addChildren(table_items)
+        
+    def remove_database(self, db_name: str) -> List[str]:
+        """Remove a connection's source node and all its database nodes; returns the removed node keys"""
+        if db_name == 'local':
+            return []
+        
+        # Remove the source node (which contains the databases)
+        source_item = self.source_nodes.pop(db_name, None)
+        if source_item is not None:
+            self.takeTopLevelItem(self.indexOfTopLevelItem(source_item))
+        
+        # Clean up all related nodes; server-level connections key theirs db_name.schema
+        prefix = f"{db_name}."
+        removed = [key for key in self.database_nodes if key == db_name or key.startswith(prefix)]
+        for key in removed:
+            del self.database_nodes[key]
+            self.table_nodes.pop(key, None)
+            self.view_nodes.pop(key, None)
+        return removed
         
     def show_context_menu(self, position):
         """Show context menu for tree items"""
@@ -1563,14 +1906,15 @@ class DatabaseTreeWidget(QTreeWidget):
                 return table_name, database
         return None, None
     
+    def _table_ref(self, table_name: str, database: str) -> str:
+        """Return the quoted, qualified name of a tree table; server-level databases are keyed db.schema"""
+        return '.'.join(_q(part) for part in database.split('.')) + '.' + _q(table_name)
+    
     def select_from_table(self, table_name: str, database: str = None):
         """Insert SELECT query for table"""
         if self.parent_gui:
             database = database or 'local'
-            if database == 'local':
-                query = f"SELECT * FROM local.{table_name} LIMIT 100;"
-            else:
-                query = f"SELECT * FROM {database}.{table_name} LIMIT 100;"
+            query = f"SELECT * FROM {self._table_ref(table_name, database)} LIMIT 100;"
             current_editor = self.parent_gui.get_current_editor()
             if current_editor:
                 current_editor.set_text(query)
@@ -1579,10 +1923,7 @@ class DatabaseTreeWidget(QTreeWidget):
         """Insert DESCRIBE query for table"""
         if self.parent_gui:
             database = database or 'local'
-            if database == 'local':
-                query = f"DESCRIBE local.{table_name};"
-            else:
-                query = f"DESCRIBE {database}.{table_name};"
+            query = f"DESCRIBE {self._table_ref(table_name, database)};"
             current_editor = self.parent_gui.get_current_editor()
             if current_editor:
                 current_editor.set_text(query)
@@ -1601,12 +1942,11 @@ class DatabaseTreeWidget(QTreeWidget):
             
             if reply == QMessageBox.StandardButton.Yes:
                 try:
-                    if database == 'local':
-                        self.parent_gui.connection.execute(f"DROP TABLE local.{table_name}")
-                        self.parent_gui.log_message(f"Table 'local.{table_name}' deleted successfully")
-                    else:
-                        self.parent_gui.connection.execute(f"DROP TABLE {database}.{table_name}")
-                        self.parent_gui.log_message(f"Table '{database}.{table_name}' deleted successfully")
+                    sql = f"DROP TABLE {self._table_ref(table_name, database)}"
+                    self.parent_gui.connection.execute(sql)
+                    self.parent_gui.log_message(f"Table '{database}.{table_name}' deleted successfully")
+                    # Cached listings of an attached database would keep showing the table until SCHEMA_TTL
+                    self.parent_gui._invalidate_schema_cache(sql)
                     self.parent_gui.refresh_database_tree()
                 except Exception as e:
                     error_msg = f"Error deleting table '{database}.{table_name}': {str(e)}"
@@ -1640,8 +1980,10 @@ class DatabaseTreeWidget(QTreeWidget):
                         return
                     
                     # Rename the table
-                    self.parent_gui.connection.execute(f"ALTER TABLE local.{table_name} RENAME TO {new_name}")
+                    sql = f"ALTER TABLE {self._table_ref(table_name, 'local')} RENAME TO {_q(new_name)}"
+                    self.parent_gui.connection.execute(sql)
                     self.parent_gui.log_message(f"Table 'local.{table_name}' renamed to 'local.{new_name}' successfully")
+                    self.parent_gui._invalidate_schema_cache(sql)
                     self.parent_gui.refresh_database_tree()
                     
                 except Exception as e:
@@ -1662,8 +2004,10 @@ class DatabaseTreeWidget(QTreeWidget):
             
             if reply == QMessageBox.StandardButton.Yes:
                 try:
-                    self.parent_gui.connection.execute(f"DROP TABLE local.{table_name}")
+                    sql = f"DROP TABLE {self._table_ref(table_name, 'local')}"
+                    self.parent_gui.connection.execute(sql)
                     self.parent_gui.log_message(f"Table 'local.{table_name}' removed successfully")
+                    self.parent_gui._invalidate_schema_cache(sql)
                     self.parent_gui.refresh_database_tree()
                 except Exception as e:
                     error_msg = f"Error removing table '{table_name}': {str(e)}"
@@ -2768,7 +3112,7 @@ class ResultsTableWidget(QWidget):
         # Initially disable pagination controls
         self.update_pagination_controls()
         
-    def display_results(self, data: List[tuple], columns: List[str], total_count: int = -1, current_page: int = 0, query: str = ""):
+    def display_results(self, data, columns: List[str], total_count: int = -1, current_page: int = 0, query: str = ""):
         """Display query results in the table with pagination info"""
         self.current_columns = columns
         self.total_count = total_count
@@ -2784,9 +3128,9 @@ class ResultsTableWidget(QWidget):
             self.table.setColumnCount(len(columns))
             self.table.setHorizontalHeaderLabels(columns)
             
-            # Batch insert items for better performance
-            for row_idx, row_data in enumerate(data):
-                for col_idx, cell_data in enumerate(row_data):
+            # Batch insert items column by column, matching how the results are stored
+            for col_idx, column_values in enumerate(result_columns(data)):
+                for row_idx, cell_data in enumerate(column_values):
                     item = QTableWidgetItem(str(cell_data) if cell_data is not None else "")
                     self.table.setItem(row_idx, col_idx, item)
             
@@ -2887,17 +3231,17 @@ class ResultsTableWidget(QWidget):
         if current_item:
             # Copy single value
             copy_value_action = QAction("Copy Value", self)
-            copy_value_action.triggered.connect(lambda: self.copy_single_value(current_item))
+            copy_value_action.triggered.connect(functools.partial(self.copy_single_value, current_item))
             menu.addAction(copy_value_action)
             
             # Copy row with headers
             copy_row_action = QAction("Copy Row with Headers", self)
-            copy_row_action.triggered.connect(lambda: self.copy_row_with_headers(current_item.row()))
+            copy_row_action.triggered.connect(functools.partial(self.copy_row_with_headers, current_item.row()))
             menu.addAction(copy_row_action)
             
             # Copy column with headers
             copy_column_action = QAction("Copy Column with Headers", self)
-            copy_column_action.triggered.connect(lambda: self.copy_column_with_headers(current_item.column()))
+            copy_column_action.triggered.connect(functools.partial(self.copy_column_with_headers, current_item.column()))
             menu.addAction(copy_column_action)
             
             menu.addSeparator()
@@ -3003,6 +3347,27 @@ class DuckDBGUI(QMainWindow):
         self.current_database = 'local'  # Track current database context
         self.current_connection = 'local'  # Track current connection context
         self.current_table_names = []  # Store current table names for autocomplete
+        self._schema_cache = {}  # Maps (db_name, schema_name) to (catalog tables, fetched_at)
+        self._schema_cache_lock = threading.Lock()  # Refresh workers fill the cache off the GUI thread
+        self._schema_cache_gen = 0  # Bumped on every invalidation so in-flight reads cannot store stale listings
+        self.schema_refresh_worker = None
+        self._refresh_in_flight = False  # A SchemaRefreshWorker is reading the catalogs
+        self._refresh_pending = False  # Another refresh was requested while one was in flight
+        self._schema_sig = {}  # Maps tree schema keys to the signature of the tables they show
+        self._export_workers = set()  # ExportWorkers that have not reported back yet
+        self._db_to_conn: Dict[str, str] = {}  # database/schema name -> connection that holds it
+        self._table_names_by_source: Dict[str, List[str]] = {}  # 'local' or connection name -> autocomplete names
+        self._current_qss = None  # Stylesheet last applied to the main window
+        self._applied_theme = None  # Theme last applied by apply_theme; None until the startup theme is set
+        self._conn_action_cache: Dict[str, tuple] = {}  # Connection name -> (connect, edit, delete) menu actions
+        self._no_conn_action = None
+        
+        # Log messages waiting for the next flush into the messages log
+        self._log_queue = deque()
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._log_flush_timer.timeout.connect(self._flush_log_messages)
         
         # Initialize theme manager
         self.theme_manager = ThemeManager()
@@ -3023,8 +3388,10 @@ class DuckDBGUI(QMainWindow):
         # Initial refresh to populate autocomplete
         self.refresh_database_tree()
         
-        # Initialize Flask web server for PivotJS visualization
-        self.setup_web_server()
+        # Flask web server for PivotJS visualization, started on first use
+        self.flask_app = None
+        self.web_server_port = None
+        self.web_server_thread = None
         
     def setup_database(self):
         """Initialize DuckDB connection"""
@@ -3042,6 +3409,8 @@ class DuckDBGUI(QMainWindow):
             db_file = os.path.join(temp_dir, 'duckdb_gui_temp.duckdb')
             
             self.connection = duckdb.connect(db_file)
+            # Let bulk imports scan and parse files on every core
+            self.connection.execute(f"PRAGMA threads={os.cpu_count() or 1}")
             # Create a named database called 'local' for easier referencing
             self.connection.execute("CREATE SCHEMA IF NOT EXISTS local")
             self.connection.execute("USE local")
@@ -3056,6 +3425,8 @@ class DuckDBGUI(QMainWindow):
         
         # Initialize query results mapping
         self.query_results_tables = {}  # Maps query tab index to results table
+        self._results_lock = threading.Lock()  # Guards query_results_tables against the web server's threads
+        self._results_versions = itertools.count(1)  # Stamps each results_data so cached pivot payloads go stale
         
         # Central widget
         central_widget = QWidget()
@@ -3163,13 +3534,16 @@ SHOW TABLES;
         tab_index = self.query_tabs.addTab(editor, tab_name)
         
         # Initialize empty results data for this query tab
-        self.query_results_tables[tab_index] = {
-            'data': [],
-            'columns': [],
-            'total_count': 0,
-            'current_page': 0,
-            'query': ''
-        }
+        with self._results_lock:
+            self.query_results_tables[tab_index] = {
+                'data': [],
+                'columns': [],
+                'total_count': 0,
+                'current_page': 0,
+                'query': '',
+                'tab_name': tab_name,
+                'version': next(self._results_versions)
+            }
         
         self.query_tabs.setCurrentIndex(tab_index)
         
@@ -3198,7 +3572,7 @@ SHOW TABLES;
             results_data = self.query_results_tables[index]
             
             # Display the results in the single results table
-            if results_data['data'] or results_data['columns']:
+            if len(results_data['data']) > 0 or results_data['columns']:
                 self.single_results_table.display_results(
                     results_data['data'],
                     results_data['columns'],
@@ -3218,17 +3592,18 @@ SHOW TABLES;
         if self.query_tabs.count() > 1:  # Keep at least one tab
             # Remove the corresponding results data
             if index in self.query_results_tables:
-                # Remove from mapping
-                del self.query_results_tables[index]
-                
-                # Update indices in the mapping for tabs after the closed one
-                updated_mapping = {}
-                for tab_index, results_data in self.query_results_tables.items():
-                    if tab_index > index:
-                        updated_mapping[tab_index - 1] = results_data
-                    else:
-                        updated_mapping[tab_index] = results_data
-                self.query_results_tables = updated_mapping
+                with self._results_lock:
+                    # Remove from mapping
+                    del self.query_results_tables[index]
+                    
+                    # Update indices in the mapping for tabs after the closed one
+                    updated_mapping = {}
+                    for tab_index, results_data in self.query_results_tables.items():
+                        if tab_index > index:
+                            updated_mapping[tab_index - 1] = results_data
+                        else:
+                            updated_mapping[tab_index] = results_data
+                    self.query_results_tables = updated_mapping
             
             self.query_tabs.removeTab(index)
             
@@ -3256,7 +3631,14 @@ SHOW TABLES;
     def set_current_tab_name(self, name):
         """Set the name of the current tab"""
         current_index = self.query_tabs.currentIndex()
-        self.query_tabs.setTabText(current_index, name)
+        self._set_tab_name(current_index, name)
+    
+    def _set_tab_name(self, index, name):
+        """Rename a tab and the copy of its name kept with its results for the web server"""
+        self.query_tabs.setTabText(index, name)
+        with self._results_lock:
+            if index in self.query_results_tables:
+                self.query_results_tables[index]['tab_name'] = name
     
     def update_all_editors_table_names(self, table_names):
         """Update table names for autocomplete in all editor tabs"""
@@ -3418,12 +3800,12 @@ SHOW TABLES;
             
             # Rename action
             rename_action = context_menu.addAction("Rename Query")
-            rename_action.triggered.connect(lambda: self.rename_tab_at_index(tab_index))
+            rename_action.triggered.connect(functools.partial(self.rename_tab_at_index, tab_index))
             
             # Close action (only if more than one tab)
             if self.query_tabs.count() > 1:
                 close_action = context_menu.addAction("Close Query")
-                close_action.triggered.connect(lambda: self.close_query_tab(tab_index))
+                close_action.triggered.connect(functools.partial(self.close_query_tab, tab_index))
             
             context_menu.exec(self.query_tabs.mapToGlobal(position))
     
@@ -3439,7 +3821,7 @@ SHOW TABLES;
         )
         
         if ok and new_name.strip():
-            self.query_tabs.setTabText(index, new_name.strip())
+            self._set_tab_name(index, new_name.strip())
             self.log_message(f"Renamed query tab to: {new_name.strip()}")
         
     def setup_menu_bar(self):
@@ -3451,22 +3833,22 @@ SHOW TABLES;
         
         # Load CSV
         load_csv_action = QAction('Load CSV File', self)
-        load_csv_action.triggered.connect(lambda: self.load_file('csv'))
+        load_csv_action.triggered.connect(functools.partial(self.load_file, 'csv'))
         file_menu.addAction(load_csv_action)
         
         # Load Excel
         load_excel_action = QAction('Load Excel File', self)
-        load_excel_action.triggered.connect(lambda: self.load_file('excel'))
+        load_excel_action.triggered.connect(functools.partial(self.load_file, 'excel'))
         file_menu.addAction(load_excel_action)
         
         # Load JSON
         load_json_action = QAction('Load JSON File', self)
-        load_json_action.triggered.connect(lambda: self.load_file('json'))
+        load_json_action.triggered.connect(functools.partial(self.load_file, 'json'))
         file_menu.addAction(load_json_action)
         
         # Load Parquet
         load_parquet_action = QAction('Load Parquet File', self)
-        load_parquet_action.triggered.connect(lambda: self.load_file('parquet'))
+        load_parquet_action.triggered.connect(functools.partial(self.load_file, 'parquet'))
         file_menu.addAction(load_parquet_action)
         
         file_menu.addSeparator()
@@ -3595,7 +3977,7 @@ SHOW TABLES;
         # Add theme actions
         for theme_name in self.theme_manager.get_themes():
             theme_action = QAction(theme_name.title(), self)
-            theme_action.triggered.connect(lambda checked, name=theme_name: self.apply_theme(name))
+            theme_action.triggered.connect(functools.partial(self.apply_theme, theme_name))
             theme_menu.addAction(theme_action)
         
         # Help menu
@@ -3623,19 +4005,19 @@ SHOW TABLES;
         
         # Load file buttons
         load_csv_btn = QPushButton('Load CSV')
-        load_csv_btn.clicked.connect(lambda: self.load_file('csv'))
+        load_csv_btn.clicked.connect(functools.partial(self.load_file, 'csv'))
         toolbar.addWidget(load_csv_btn)
         
         load_excel_btn = QPushButton('Load Excel')
-        load_excel_btn.clicked.connect(lambda: self.load_file('excel'))
+        load_excel_btn.clicked.connect(functools.partial(self.load_file, 'excel'))
         toolbar.addWidget(load_excel_btn)
         
         load_json_btn = QPushButton('Load JSON')
-        load_json_btn.clicked.connect(lambda: self.load_file('json'))
+        load_json_btn.clicked.connect(functools.partial(self.load_file, 'json'))
         toolbar.addWidget(load_json_btn)
         
         load_parquet_btn = QPushButton('Load Parquet')
-        load_parquet_btn.clicked.connect(lambda: self.load_file('parquet'))
+        load_parquet_btn.clicked.connect(functools.partial(self.load_file, 'parquet'))
         toolbar.addWidget(load_parquet_btn)
         
         toolbar.addSeparator()
@@ -3725,19 +4107,20 @@ SHOW TABLES;
     def get_unique_table_name(self, base_name: str) -> str:
         """Generate a unique table name by checking existing tables"""
         try:
-            # Get existing table names
-            existing_tables = set()
-            tables_result = self.connection.execute("SHOW TABLES").fetchall()
-            for table_row in tables_result:
-                existing_tables.add(table_row[0].lower())
+            # Get existing table names, already lowercased by DuckDB
+            tables_result = self.connection.execute(
+                "SELECT lower(table_name) FROM information_schema.tables WHERE table_schema = 'local'"
+            ).fetchall()
+            existing_tables = {table_row[0] for table_row in tables_result}
             
             # If base name doesn't exist, use it
-            if base_name.lower() not in existing_tables:
+            lower_base = base_name.lower()
+            if lower_base not in existing_tables:
                 return base_name
             
             # Generate unique name with counter
             counter = 1
-            while f"{base_name}_{counter}".lower() in existing_tables:
+            while f"{lower_base}_{counter}" in existing_tables:
                 counter += 1
             
             return f"{base_name}_{counter}"
@@ -3746,44 +4129,111 @@ SHOW TABLES;
             # If there's an error checking tables, just return base name
             return base_name
     
+    def _validate_table_name(self, table_name: str) -> str:
+        """Ensure a table name is a plain identifier before it is interpolated into SQL"""
+        if not _IDENTIFIER_RE.match(table_name or ''):
+            raise ValueError(
+                f"Invalid table name '{table_name}': use only letters, digits and underscores, "
+                "and do not start with a digit"
+            )
+        return table_name
+    
+    def _create_table_sql(self, table_name: str, select_sql: str) -> str:
+        """Return the CREATE TABLE local.<table_name> statement for a SELECT, validating the table name"""
+        # Only the identifier is interpolated; file paths and options stay bound parameters
+        return f"CREATE TABLE local.{self._validate_table_name(table_name)} AS {select_sql}"
+    
+    def _pl_to_duck(self, table_name: str, df):
+        """Create local.<table_name> from a Polars DataFrame, streamed to DuckDB as Arrow record batches"""
+        # A RecordBatchReader lets DuckDB pull the zero-copy Arrow view chunk by chunk
+        # instead of scanning it as one table
+        self.connection.register('_tmp_df', df.to_arrow().to_reader(max_chunksize=ARROW_INGEST_BATCH_ROWS))
+        try:
+            self.connection.execute(self._create_table_sql(table_name, "SELECT * FROM _tmp_df"))
+        finally:
+            self.connection.unregister('_tmp_df')
+    
+    def _sniff_csv_options(self, file_path: str, pinned: dict = None) -> dict:
+        """Sniff a CSV file once and return read_csv options that read it without another sniffing pass"""
+        pinned = pinned or {}
+        option_args = "".join(f", {key}=?" for key in pinned)
+        (delimiter, quote, escape, new_line, comment, skip, header,
+         columns, date_format, timestamp_format) = self.connection.execute(
+            "SELECT Delimiter, Quote, Escape, NewLineDelimiter, Comment, SkipRows, HasHeader, Columns, "
+            f"DateFormat, TimestampFormat FROM sniff_csv(?{option_args})",
+            [file_path, *pinned.values()]
+        ).fetchone()
+        
+        # sniff_csv reports an unset character as '(empty)'
+        options = {
+            'auto_detect': False,
+            'delim': delimiter,
+            'quote': '' if quote == '(empty)' else quote,
+            'escape': '' if escape == '(empty)' else escape,
+            'new_line': new_line,
+            'comment': '' if comment == '(empty)' else comment,
+            'skip': skip,
+            'header': header,
+            'columns': {column['name']: column['type'] for column in columns},
+        }
+        if date_format:
+            options['dateformat'] = date_format
+        if timestamp_format:
+            options['timestampformat'] = timestamp_format
+        return options
+    
+    def _load_csv_with_options(self, file_path: str, table_name: str, options: dict):
+        """Create local.<table_name> from a CSV file, binding the read_csv options as parameters"""
+        option_args = "".join(f", {key}=?" for key in options)
+        query = self._create_table_sql(table_name, f"SELECT * FROM read_csv(?{option_args})")
+        self.connection.execute(query, [file_path, *options.values()])
+    
+    def _load_csv_as_text(self, file_path: str, table_name: str, options: dict):
+        """Create local.<table_name> from a CSV file with every column as VARCHAR"""
+        # The dialect was sniffed for the first attempt; only the column types change, so no new sniff is needed
+        text_options = dict(options, columns={name: 'VARCHAR' for name in options['columns']})
+        self._load_csv_with_options(file_path, table_name, text_options)
+    
+    def _load_csv_with_text_fallback(self, file_path: str, table_name: str, pinned: dict = None):
+        """Load a CSV file with its sniffed column types, retrying with every column as VARCHAR on failure.
+        
+        Returns True if the retry was needed. The file is sniffed once and both attempts reuse the result.
+        """
+        options = self._sniff_csv_options(file_path, pinned)
+        try:
+            self._load_csv_with_options(file_path, table_name, options)
+            return False
+        except Exception as e:
+            # If there's a conversion error, try loading all columns as text
+            self.log_message(f"Initial load failed: {str(e)}. Retrying with all columns as text...")
+            try:
+                self._load_csv_as_text(file_path, table_name, options)
+            except Exception:
+                # Re-raise the original error if text loading also fails
+                raise e
+            return True
+    
     def load_csv_file_with_dialog(self, file_path: str, table_name: str):
         """Load CSV file with configuration dialog"""
+        # Reject a bad name up front rather than letting it trigger the all-text retry
+        table_name = self._validate_table_name(table_name)
         dialog = CSVImportDialog(self, file_path)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             try:
-                query = dialog.get_csv_query(table_name)
-                self.connection.execute(query)
-                self.log_message(f"Successfully loaded {file_path} as table '{table_name}'")
+                as_text = self._load_csv_with_text_fallback(file_path, table_name, dialog.get_csv_options())
+                suffix = " with all columns as text" if as_text else ""
+                self.log_message(f"Successfully loaded {file_path} as table '{table_name}'{suffix}")
                 self.refresh_database_tree()
             except Exception as e:
-                # If there's a conversion error, try loading all columns as text
-                self.log_message(f"Initial load failed: {str(e)}. Retrying with all columns as text...")
-                try:
-                    query_with_text = dialog.get_csv_query_as_text(table_name)
-                    self.connection.execute(query_with_text)
-                    self.log_message(f"Successfully loaded {file_path} as table '{table_name}' with all columns as text")
-                    self.refresh_database_tree()
-                except Exception as e2:
-                    error_msg = f"Error loading CSV file even with text columns: {str(e2)}"
-                    self.log_message(error_msg)
-                    QMessageBox.critical(self, "CSV Load Error", error_msg)
+                error_msg = f"Error loading CSV file: {str(e)}"
+                self.log_message(error_msg)
+                QMessageBox.critical(self, "CSV Load Error", error_msg)
                 
     def load_csv_file(self, file_path: str, table_name: str):
         """Load CSV file using DuckDB (direct method without dialog)"""
-        try:
-            query = f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{file_path}')"
-            self.connection.execute(query)
-        except Exception as e:
-            # If there's a conversion error, try loading all columns as text
-            self.log_message(f"Initial auto-load failed: {str(e)}. Retrying with all columns as text...")
-            try:
-                query_with_text = f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{file_path}', ALL_VARCHAR=true)"
-                self.connection.execute(query_with_text)
-                self.log_message(f"Successfully loaded {file_path} as table '{table_name}' with all columns as text")
-            except Exception as e2:
-                # Re-raise the original error if text loading also fails
-                raise e
+        if self._load_csv_with_text_fallback(file_path, table_name):
+            self.log_message(f"Successfully loaded {file_path} as table '{table_name}' with all columns as text")
         
     def load_excel_file_with_dialog(self, file_path: str, table_name: str):
         """Load Excel file with configuration dialog"""
@@ -3796,20 +4246,17 @@ SHOW TABLES;
                 
                 # Use Polars to read Excel file with specified sheet
                 if sheet_name:
-                    df = pl.read_excel(file_path, sheet_name=sheet_name)
+                    df = pl.read_excel(file_path, sheet_name=sheet_name, **EXCEL_READ_OPTIONS)
                 else:
-                    df = pl.read_excel(file_path)  # First sheet by default
+                    df = pl.read_excel(file_path, **EXCEL_READ_OPTIONS)  # First sheet by default
                 
                 # Convert all columns to text if requested
                 if convert_to_text:
-                    text_columns = []
-                    for col in df.columns:
-                        text_columns.append(pl.col(col).cast(pl.Utf8).alias(col))
-                    df = df.select(text_columns)
+                    df = df.select(pl.all().cast(pl.Utf8))
                     self.log_message(f"All columns converted to text as requested")
                 
                 # Convert to DuckDB table
-                self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM df")
+                self._pl_to_duck(table_name, df)
                 success_msg = f"Successfully loaded {file_path} as table '{table_name}'"
                 if convert_to_text:
                     success_msg += " (all columns as text)"
@@ -3822,48 +4269,41 @@ SHOW TABLES;
                 
     def load_excel_file(self, file_path: str, table_name: str):
         """Load Excel file using Polars and DuckDB (direct method without dialog)"""
+        table_name = self._validate_table_name(table_name)
+        
         # Use Polars to read Excel file
-        df = pl.read_excel(file_path)
+        df = pl.read_excel(file_path, **EXCEL_READ_OPTIONS)
         
         # Convert to DuckDB table
-        self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM df")
+        self._pl_to_duck(table_name, df)
         
     def load_json_file(self, file_path: str, table_name: str):
         """Load JSON file using DuckDB"""
-        query = f"CREATE TABLE {table_name} AS SELECT * FROM read_json_auto('{file_path}')"
-        self.connection.execute(query)
+        query = self._create_table_sql(table_name, "SELECT * FROM read_json_auto(?)")
+        self.connection.execute(query, [file_path])
         
     def load_parquet_file(self, file_path: str, table_name: str):
         """Load Parquet file using DuckDB"""
-        query = f"CREATE TABLE {table_name} AS SELECT * FROM read_parquet('{file_path}')"
-        self.connection.execute(query)
+        query = self._create_table_sql(table_name, "SELECT * FROM read_parquet(?)")
+        self.connection.execute(query, [file_path])
     
     def load_csv_file_with_delimiter(self, file_path: str, table_name: str, delimiter: str = ','):
         """Load CSV file with specified delimiter"""
-        try:
-            query = f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{file_path}', delim='{delimiter}')"
-            self.connection.execute(query)
-        except Exception as e:
-            # If there's a conversion error, try loading all columns as text
-            self.log_message(f"Initial auto-load failed: {str(e)}. Retrying with all columns as text...")
-            try:
-                query_with_text = f"CREATE TABLE local.{table_name} AS SELECT * FROM read_csv_auto('{file_path}', delim='{delimiter}', ALL_VARCHAR=true)"
-                self.connection.execute(query_with_text)
-                self.log_message(f"Successfully loaded {file_path} as table '{table_name}' with all columns as text")
-            except Exception as e2:
-                # Re-raise the original error if text loading also fails
-                raise e
+        if self._load_csv_with_text_fallback(file_path, table_name, {'delim': delimiter}):
+            self.log_message(f"Successfully loaded {file_path} as table '{table_name}' with all columns as text")
     
     def load_excel_file_with_sheet(self, file_path: str, table_name: str, sheet_name: str = None):
         """Load Excel file with specified sheet name"""
+        table_name = self._validate_table_name(table_name)
+        
         # Use Polars to read Excel file with specified sheet
         if sheet_name:
-            df = pl.read_excel(file_path, sheet_name=sheet_name)
+            df = pl.read_excel(file_path, sheet_name=sheet_name, **EXCEL_READ_OPTIONS)
         else:
-            df = pl.read_excel(file_path)  # First sheet by default
+            df = pl.read_excel(file_path, **EXCEL_READ_OPTIONS)  # First sheet by default
         
         # Convert to DuckDB table
-        self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM df")
+        self._pl_to_duck(table_name, df)
     
     def load_csv_folder_with_delimiter(self, folder_path: str, table_name: str, delimiter: str = ',', quote_char: str = None, has_header: bool = True, encoding: str = 'utf8'):
         """Load all CSV files from a folder with specified delimiter for automation"""
@@ -3871,11 +4311,8 @@ SHOW TABLES;
             raise Exception("Polars library is required for folder loading feature")
         
         try:
-            import os
-            import glob
-            
             # Find all CSV files in the folder
-            csv_files = glob.glob(os.path.join(folder_path, '*.csv'))
+            csv_files = self._find_folder_files(folder_path, ('.csv',))
                 
             if not csv_files:
                 raise Exception("No CSV files found in the selected folder")
@@ -3883,52 +4320,35 @@ SHOW TABLES;
             # Make sure table name is unique
             table_name = self.get_unique_table_name(table_name)
             
-            # Load and combine all CSV files
-            combined_df = None
-            loaded_files = []
+            # Read CSV with Polars using the configured settings
+            read_options = {
+                'has_header': has_header,
+                'encoding': encoding
+            }
             
-            for file_path in csv_files:
-                try:
-                    # Read CSV with Polars using the configured settings
-                    read_options = {
-                        'has_header': has_header,
-                        'encoding': encoding
-                    }
-                    
-                    # Add separator if specified
-                    if delimiter is not None:
-                        read_options['separator'] = delimiter
-                    
-                    # Add quote character if specified
-                    if quote_char is not None:
-                        read_options['quote_char'] = quote_char
-                    
-                    df = pl.read_csv(file_path, **read_options)
-                    
-                    # Add source file column
-                    df = df.with_columns(pl.lit(os.path.basename(file_path)).alias('_source_file'))
-                    
-                    if combined_df is None:
-                        combined_df = df
-                    else:
-                        # Use concat with how='diagonal' to handle different schemas
-                        combined_df = pl.concat([combined_df, df], how='diagonal')
-                    
-                    loaded_files.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    self.log_message(f"Warning: Could not load {os.path.basename(file_path)}: {str(e)}")
-                    continue
+            # Add separator if specified
+            if delimiter is not None:
+                read_options['separator'] = delimiter
+            
+            # Add quote character if specified
+            if quote_char is not None:
+                read_options['quote_char'] = quote_char
+            
+            # Detect the dialect once for the whole folder rather than per file
+            read_options = self._resolve_csv_folder_options(csv_files[0], read_options)
+            
+            # Load and combine all CSV files
+            combined_lf, loaded_files = self._load_csv_folder_core(csv_files, read_options)
+            combined_df = combined_lf.collect() if combined_lf is not None else None
             
             if combined_df is None or combined_df.height == 0:
                 raise Exception("No data could be loaded from any CSV files in the folder")
                 
             # Create table in DuckDB
-            self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM combined_df")
+            self._pl_to_duck(table_name, combined_df)
             
             # Log success message
-            success_msg = f"Successfully loaded {len(loaded_files)} CSV files into table '{table_name}': {', '.join(loaded_files)}"
-            self.log_message(success_msg)
+            self.log_message(self._folder_success_message('CSV', table_name, loaded_files))
             self.refresh_database_tree()
             
         except Exception as e:
@@ -3936,6 +4356,179 @@ SHOW TABLES;
             self.log_message(error_msg)
             raise Exception(error_msg)
         
+    def load_parquet_folder(self, folder_path: str, table_name: str):
+        """Load all Parquet files from a folder with one DuckDB multi-file scan"""
+        self._load_folder_native(folder_path, table_name, 'Parquet', ('.parquet',), 'read_parquet')
+    
+    def load_json_folder(self, folder_path: str, table_name: str):
+        """Load all JSON files from a folder with one DuckDB multi-file scan"""
+        self._load_folder_native(folder_path, table_name, 'JSON', ('.json', '.jsonl'), 'read_json_auto')
+    
+    def _load_folder_native(self, folder_path: str, table_name: str, label: str, extensions: tuple, reader: str):
+        """Combine every matching file in a folder using DuckDB's parallel multi-file readers"""
+        try:
+            files = self._find_folder_files(folder_path, extensions)
+            
+            if not files:
+                raise Exception(f"No {label} files found in the selected folder")
+            
+            # Make sure table name is unique
+            table_name = self._validate_table_name(self.get_unique_table_name(table_name))
+            
+            # DuckDB reads the file list on its own worker threads; union_by_name handles
+            # differing schemas and the filename column becomes _source_file like the other folder loaders
+            with self._unordered_bulk_load():
+                self.connection.execute(
+                    self._create_table_sql(
+                        table_name,
+                        f"SELECT * EXCLUDE (filename), regexp_replace(filename, '^.*[\\\\/]', '') AS _source_file "
+                        f"FROM {reader}(?, union_by_name=true, filename=true)"
+                    ),
+                    [files]
+                )
+            
+            self.log_message(f"Successfully loaded {len(files)} {label} files into table '{table_name}'")
+            self.refresh_database_tree()
+            
+        except Exception as e:
+            error_msg = f"Error loading {label} folder: {str(e)}"
+            self.log_message(error_msg)
+            raise Exception(error_msg)
+    
+    @contextmanager
+    def _unordered_bulk_load(self):
+        """Drop insertion order for one bulk load, removing the serialization point at the sink of multi-file scans"""
+        # Only for the load itself: the session keeps insertion order so LIMIT/OFFSET pages stay stable
+        self.connection.execute("SET preserve_insertion_order=false")
+        try:
+            yield
+        finally:
+            self.connection.execute("RESET preserve_insertion_order")
+    
+    def _find_folder_files(self, folder_path: str, extensions: tuple, min_bytes: int = 1) -> List[str]:
+        """List the files in a folder whose names end with any of the given extensions, sorted by path"""
+        files = []
+        skipped = []
+        
+        # scandir hands back cached directory entries, so there is no separate glob or fnmatch pass;
+        # files too small to hold any data are dropped here instead of failing inside a parser
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if not (entry.is_file() and entry.name.lower().endswith(extensions)):
+                    continue
+                if entry.stat().st_size < min_bytes:
+                    skipped.append(entry.name)
+                else:
+                    files.append(entry.path)
+        
+        if skipped:
+            self.log_message(f"Skipped {len(skipped)} empty file(s): {', '.join(sorted(skipped))}")
+        
+        return sorted(files)
+    
+    def _read_excel_file_as_text(self, file_path: str, sheet_name: str = None):
+        """Read one Excel file as (LazyFrame, column names) with every column as text plus a _source_file column"""
+        # Read Excel file with Polars, using specified sheet
+        if sheet_name:
+            df = pl.read_excel(file_path, sheet_name=sheet_name, **EXCEL_READ_OPTIONS)
+        else:
+            df = pl.read_excel(file_path, **EXCEL_READ_OPTIONS)  # Use first sheet
+        
+        # Convert all columns to text to avoid schema conflicts and add the source file
+        # column in one projection; staying lazy lets Polars fuse it with the final concat
+        lazy_df = df.lazy().select(
+            pl.all().cast(pl.Utf8),
+            pl.lit(os.path.basename(file_path)).alias('_source_file')
+        )
+        return lazy_df, tuple(df.columns)
+    
+    def _load_excel_folder_core(self, excel_files: List[str], sheet_name: str = None):
+        """Read and combine Excel files, returning (combined_lazyframe, loaded_files, schema_conflicts_detected)"""
+        frames = []
+        loaded_files = []
+        column_layouts = set()
+        
+        # Excel parsing is CPU-bound per file, so spread the files across cores
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = [pool.submit(self._read_excel_file_as_text, file_path, sheet_name) for file_path in excel_files]
+            
+            # Collect in submission order so the combined table keeps a deterministic row order
+            for file_path, future in zip(excel_files, futures):
+                try:
+                    lazy_df, columns = future.result()
+                    frames.append(lazy_df)
+                    column_layouts.add(columns)
+                    loaded_files.append(os.path.basename(file_path))
+                except Exception as e:
+                    self.log_message(f"Warning: Could not load {os.path.basename(file_path)} (sheet: {sheet_name or 'first'}): {str(e)}")
+        
+        if not frames:
+            return None, loaded_files, False
+        
+        # Every column is text, so a diagonal concat only differs from a vertical one
+        # when the files have different column sets
+        return pl.concat(frames, how='diagonal_relaxed'), loaded_files, len(column_layouts) > 1
+    
+    def _folder_success_message(self, label: str, table_name: str, loaded_files: List[str], notes: List[str] = ()) -> str:
+        """Build the log message for a successful folder load in a single join"""
+        parts = [f"Successfully loaded {len(loaded_files)} {label} files into table '{table_name}': {', '.join(loaded_files)}"]
+        parts.extend(f"Note: {note}" for note in notes)
+        return '\n'.join(parts)
+    
+    def _excel_folder_success_message(self, table_name: str, loaded_files: List[str], schema_conflicts_detected: bool) -> str:
+        """Build the log message for a successful Excel folder load"""
+        # Log success message with information about text conversion
+        if schema_conflicts_detected:
+            note = "Different column schemas detected - all columns converted to text for compatibility."
+        else:
+            note = "All columns automatically converted to text to ensure data consistency."
+        return self._folder_success_message('Excel', table_name, loaded_files, [note])
+    
+    def _resolve_csv_folder_options(self, first_file: str, read_options: dict) -> dict:
+        """Fill in any separator/quote character left on auto by sniffing the folder's first file once"""
+        if 'separator' in read_options and 'quote_char' in read_options:
+            return read_options
+        
+        try:
+            delimiter, quote = self.connection.execute(
+                "SELECT Delimiter, Quote FROM sniff_csv(?)", [first_file]
+            ).fetchone()
+        except Exception as e:
+            self.log_message(f"Warning: Could not detect CSV dialect from {os.path.basename(first_file)}: {str(e)}")
+            return read_options
+        
+        # Polars only takes single-byte characters; sniff_csv reports "no quote" as '(empty)',
+        # and one file without quoted fields says nothing about the rest, so keep Polars' '"' then
+        resolved = dict(read_options)
+        if delimiter and len(delimiter) == 1:
+            resolved.setdefault('separator', delimiter)
+        if quote and len(quote) == 1 and quote != '\x00':
+            resolved.setdefault('quote_char', quote)
+        return resolved
+    
+    def _load_csv_folder_core(self, csv_files: List[str], read_options: dict):
+        """Read and combine CSV files, returning (combined_lazyframe, loaded_files)"""
+        frames = []
+        loaded_files = []
+        
+        for file_path in csv_files:
+            try:
+                df = pl.read_csv(file_path, **read_options)
+                
+                # Add source file column
+                frames.append(df.lazy().with_columns(pl.lit(os.path.basename(file_path)).alias('_source_file')))
+                loaded_files.append(os.path.basename(file_path))
+                
+            except Exception as e:
+                self.log_message(f"Warning: Could not load {os.path.basename(file_path)}: {str(e)}")
+                continue
+        
+        if not frames:
+            return None, loaded_files
+        
+        # Use a relaxed diagonal concat to handle different column sets and types
+        return pl.concat(frames, how='diagonal_relaxed'), loaded_files
+    
     def load_folder(self):
         """Load all Excel files from a selected folder"""
         if not POLARS_AVAILABLE:
@@ -3954,15 +4547,8 @@ SHOW TABLES;
             return
             
         try:
-            import os
-            import glob
-            
             # Find all Excel files in the folder
-            excel_extensions = ['*.xlsx', '*.xls']
-            excel_files = []
-            
-            for ext in excel_extensions:
-                excel_files.extend(glob.glob(os.path.join(folder_path, ext)))
+            excel_files = self._find_folder_files(folder_path, ('.xlsx', '.xls'), MIN_EXCEL_FILE_BYTES)
                 
             if not excel_files:
                 QMessageBox.information(
@@ -4000,48 +4586,9 @@ SHOW TABLES;
             # Make sure table name is unique
             table_name = self.get_unique_table_name(table_name)
             
-            # Load and combine all Excel files with automatic text conversion for schema conflicts
-            combined_df = None
-            loaded_files = []
-            schema_conflicts_detected = False
-            
-            for file_path in excel_files:
-                try:
-                    # Read Excel file with Polars, using specified sheet
-                    if sheet_name:
-                        df = pl.read_excel(file_path, sheet_name=sheet_name)
-                    else:
-                        df = pl.read_excel(file_path)  # Use first sheet
-                    
-                    # Convert all columns to text to avoid schema conflicts
-                    # This ensures consistent data types across all files
-                    text_columns = []
-                    for col in df.columns:
-                        text_columns.append(pl.col(col).cast(pl.Utf8).alias(col))
-                    
-                    df = df.select(text_columns)
-                    
-                    # Add source file column
-                    df = df.with_columns(
-                        pl.lit(os.path.basename(file_path)).alias('_source_file')
-                    )
-                    
-                    if combined_df is None:
-                        combined_df = df
-                    else:
-                        try:
-                            # Try to concatenate normally first
-                            combined_df = pl.concat([combined_df, df], how='vertical')
-                        except Exception:
-                            # If vertical concat fails, use diagonal (handles different column sets)
-                            combined_df = pl.concat([combined_df, df], how='diagonal')
-                            schema_conflicts_detected = True
-                    
-                    loaded_files.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    self.log_message(f"Warning: Could not load {os.path.basename(file_path)} (sheet: {sheet_name or 'first'}): {str(e)}")
-                    continue
+            # Read all Excel files in parallel, then combine with automatic text conversion for schema conflicts
+            combined_lf, loaded_files, schema_conflicts_detected = self._load_excel_folder_core(excel_files, sheet_name)
+            combined_df = combined_lf.collect() if combined_lf is not None else None
             
             if combined_df is None or combined_df.height == 0:
                 QMessageBox.warning(
@@ -4051,16 +4598,9 @@ SHOW TABLES;
                 return
                 
             # Create table in DuckDB
-            self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM combined_df")
+            self._pl_to_duck(table_name, combined_df)
             
-            # Log success message with information about text conversion
-            success_msg = f"Successfully loaded {len(loaded_files)} Excel files into table '{table_name}': {', '.join(loaded_files)}"
-            if schema_conflicts_detected:
-                success_msg += "\nNote: Different column schemas detected - all columns converted to text for compatibility."
-            else:
-                success_msg += "\nNote: All columns automatically converted to text to ensure data consistency."
-            
-            self.log_message(success_msg)
+            self.log_message(self._excel_folder_success_message(table_name, loaded_files, schema_conflicts_detected))
             self.refresh_database_tree()
             
         except Exception as e:
@@ -4074,15 +4614,8 @@ SHOW TABLES;
             raise Exception("Polars library is required for folder loading feature")
             
         try:
-            import os
-            import glob
-            
             # Find all Excel files in the folder
-            excel_extensions = ['*.xlsx', '*.xls']
-            excel_files = []
-            
-            for ext in excel_extensions:
-                excel_files.extend(glob.glob(os.path.join(folder_path, ext)))
+            excel_files = self._find_folder_files(folder_path, ('.xlsx', '.xls'), MIN_EXCEL_FILE_BYTES)
                 
             if not excel_files:
                 raise Exception("No Excel files found in the selected folder")
@@ -4090,63 +4623,17 @@ SHOW TABLES;
             # Make sure table name is unique
             table_name = self.get_unique_table_name(table_name)
             
-            # Load and combine all Excel files with automatic text conversion for schema conflicts
-            combined_df = None
-            loaded_files = []
-            schema_conflicts_detected = False
-            
-            for file_path in excel_files:
-                try:
-                    # Read Excel file with Polars, using specified sheet
-                    if sheet_name:
-                        df = pl.read_excel(file_path, sheet_name=sheet_name)
-                    else:
-                        df = pl.read_excel(file_path)  # Use first sheet
-                    
-                    # Convert all columns to text to avoid schema conflicts
-                    # This ensures consistent data types across all files
-                    text_columns = []
-                    for col in df.columns:
-                        text_columns.append(pl.col(col).cast(pl.Utf8).alias(col))
-                    
-                    df = df.select(text_columns)
-                    
-                    # Add source file column
-                    df = df.with_columns(
-                        pl.lit(os.path.basename(file_path)).alias('_source_file')
-                    )
-                    
-                    if combined_df is None:
-                        combined_df = df
-                    else:
-                        try:
-                            # Try to concatenate normally first
-                            combined_df = pl.concat([combined_df, df], how='vertical')
-                        except Exception:
-                            # If vertical concat fails, use diagonal (handles different column sets)
-                            combined_df = pl.concat([combined_df, df], how='diagonal')
-                            schema_conflicts_detected = True
-                    
-                    loaded_files.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    self.log_message(f"Warning: Could not load {os.path.basename(file_path)} (sheet: {sheet_name or 'first'}): {str(e)}")
-                    continue
+            # Read all Excel files in parallel, then combine with automatic text conversion for schema conflicts
+            combined_lf, loaded_files, schema_conflicts_detected = self._load_excel_folder_core(excel_files, sheet_name)
+            combined_df = combined_lf.collect() if combined_lf is not None else None
             
             if combined_df is None or combined_df.height == 0:
                 raise Exception("No data could be loaded from any Excel files in the folder")
                 
             # Create table in DuckDB
-            self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM combined_df")
-            
-            # Log success message with information about text conversion
-            success_msg = f"Successfully loaded {len(loaded_files)} Excel files into table '{table_name}': {', '.join(loaded_files)}"
-            if schema_conflicts_detected:
-                success_msg += "\nNote: Different column schemas detected - all columns converted to text for compatibility."
-            else:
-                success_msg += "\nNote: All columns automatically converted to text to ensure data consistency."
+            self._pl_to_duck(table_name, combined_df)
             
-            self.log_message(success_msg)
+            self.log_message(self._excel_folder_success_message(table_name, loaded_files, schema_conflicts_detected))
             self.refresh_database_tree()
             
         except Exception as e:
@@ -4172,13 +4659,27 @@ SHOW TABLES;
             return
             
         try:
-            import os
-            import glob
-            
             # Find all CSV files in the folder
-            csv_files = glob.glob(os.path.join(folder_path, '*.csv'))
+            csv_files = self._find_folder_files(folder_path, ('.csv',))
                 
             if not csv_files:
+                # Parquet and JSON folders can be combined natively by DuckDB without Polars
+                for label, extensions, loader in (
+                    ('Parquet', ('.parquet',), self.load_parquet_folder),
+                    ('JSON', ('.json', '.jsonl'), self.load_json_folder),
+                ):
+                    if self._find_folder_files(folder_path, extensions):
+                        table_name, ok = QInputDialog.getText(
+                            self, 
+                            "Table Name", 
+                            f"No CSV files found, but the folder contains {label} files.\n"
+                            f"Enter table name for the combined {label} data:",
+                            text=f"combined_{label.lower()}_data"
+                        )
+                        if ok and table_name.strip():
+                            loader(folder_path, table_name.strip())
+                        return
+                
                 QMessageBox.information(
                     self, "No CSV Files", 
                     "No CSV files found in the selected folder."
@@ -4212,45 +4713,29 @@ SHOW TABLES;
             table_name = table_name.strip()
             table_name = self.get_unique_table_name(table_name)
             
-            # Load and combine all CSV files
-            combined_df = None
-            loaded_files = []
+            # Read CSV with Polars using the configured settings
+            read_options = {
+                'has_header': has_header,
+                'encoding': encoding if encoding != 'Auto' else 'utf8'
+            }
             
-            for file_path in csv_files:
-                try:
-                    # Read CSV with Polars using the configured settings
-                    read_options = {
-                        'has_header': has_header,
-                        'encoding': encoding if encoding != 'Auto' else 'utf8'
-                    }
-                    
-                    # Only add separator if not using automatic detection
-                    if delimiter is not None:
-                        read_options['separator'] = delimiter
-                    
-                    # Handle quote character
-                    if quote_char is not None and quote_char != 'Auto':
-                        if quote_char == '':
-                            read_options['quote_char'] = None
-                        else:
-                            read_options['quote_char'] = quote_char
-                    
-                    df = pl.read_csv(file_path, **read_options)
-                    
-                    # Add source file column
-                    df = df.with_columns(pl.lit(os.path.basename(file_path)).alias('_source_file'))
-                    
-                    if combined_df is None:
-                        combined_df = df
-                    else:
-                        # Use concat with how='diagonal' to handle different schemas
-                        combined_df = pl.concat([combined_df, df], how='diagonal')
-                    
-                    loaded_files.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    self.log_message(f"Warning: Could not load {os.path.basename(file_path)}: {str(e)}")
-                    continue
+            # Only add separator if not using automatic detection
+            if delimiter is not None:
+                read_options['separator'] = delimiter
+            
+            # Handle quote character
+            if quote_char is not None and quote_char != 'Auto':
+                if quote_char == '':
+                    read_options['quote_char'] = None
+                else:
+                    read_options['quote_char'] = quote_char
+            
+            # Detect the dialect once for the whole folder rather than per file
+            read_options = self._resolve_csv_folder_options(csv_files[0], read_options)
+            
+            # Load and combine all CSV files
+            combined_lf, loaded_files = self._load_csv_folder_core(csv_files, read_options)
+            combined_df = combined_lf.collect() if combined_lf is not None else None
             
             if combined_df is None or combined_df.height == 0:
                 QMessageBox.warning(
@@ -4260,12 +4745,10 @@ SHOW TABLES;
                 return
                 
             # Create table in DuckDB
-            self.connection.execute(f"CREATE TABLE local.{table_name} AS SELECT * FROM combined_df")
+            self._pl_to_duck(table_name, combined_df)
             
             # Log success message
-            self.log_message(
-                f"Successfully loaded {len(loaded_files)} CSV files into table '{table_name}': {', '.join(loaded_files)}"
-            )
+            self.log_message(self._folder_success_message('CSV', table_name, loaded_files))
             self.refresh_database_tree()
             
         except Exception as e:
@@ -4273,191 +4756,262 @@ SHOW TABLES;
             self.log_message(error_msg)
             QMessageBox.critical(self, "Load Error", error_msg)
         
-    def refresh_database_tree(self):
-        """Refresh the database tree with current tables"""
+    def _fetch_catalog_tables(self, connection, db_name: str, schema_name: str = None) -> Dict[str, Dict[str, List[str]]]:
+        """Return {schema: {table: [column descriptions]}} for an attached database using two catalog queries"""
+        catalog_tables: Dict[str, Dict[str, List[str]]] = {}
+        tables_result = connection.execute(_Q_TABLES, [db_name, schema_name]).fetchall()
+        for table_schema, table_name in tables_result:
+            # Skip system schemas and tables
+            if table_schema.lower() in ('information_schema', 'mysql', 'performance_schema', 'sys'):
+                continue
+            if _SYS_TBL_RE.match(table_name):
+                continue
+            catalog_tables.setdefault(table_schema, {})[table_name] = []
+        
+        columns_result = connection.execute(_Q_COLS, [db_name, schema_name]).fetchall()
+        for table_schema, table_name, column_name, data_type in columns_result:
+            columns = catalog_tables.get(table_schema, {}).get(table_name)
+            if columns is not None:
+                columns.append(f"{column_name} ({data_type})")
+        
+        return catalog_tables
+    
+    def _get_catalog_tables(self, connection, db_name: str, schema_name: str = None) -> Dict[str, Dict[str, List[str]]]:
+        """Return _fetch_catalog_tables() for an attached database, reusing results younger than SCHEMA_TTL"""
+        key = (db_name, schema_name)
+        now = time.monotonic()
+        with self._schema_cache_lock:
+            entry = self._schema_cache.get(key)
+            generation = self._schema_cache_gen
+        if entry and now - entry[1] < SCHEMA_TTL:
+            return entry[0]
+        
+        catalog_tables = self._fetch_catalog_tables(connection, db_name, schema_name)
+        with self._schema_cache_lock:
+            # Skip the store if the cache was invalidated while the catalogs were being read
+            if self._schema_cache_gen == generation:
+                self._schema_cache[key] = (catalog_tables, now)
+        return catalog_tables
+    
+    def _drop_schema_cache(self, predicate=None):
+        """Drop cached catalog listings whose db_name matches predicate, or all of them"""
+        with self._schema_cache_lock:
+            self._schema_cache_gen += 1
+            for key in list(self._schema_cache):
+                if predicate is None or predicate(key[0]):
+                    del self._schema_cache[key]
+    
+    def _list_server_schemas(self, connection, db_name: str) -> List[str]:
+        """List the databases of a server-level connection, skipping system databases"""
+        return [
+            row[0] for row in connection.execute(_Q_SCHEMAS, [db_name]).fetchall()
+            if row[0].lower() not in ('information_schema', 'mysql', 'performance_schema', 'sys')
+        ]
+    
+    def _collect_database_schemas(self, connection, db_name: str, database: Optional[str]):
+        """Return ({schema: {table: [columns]}}, errors) for one attached database"""
+        errors = []
+        cursor = connection.cursor()
         try:
-            # Clear existing tables for local database
-            self.db_tree.local_tables_node.takeChildren()
+            # Server-level connections list every database as a schema,
+            # database-specific connections only their own
+            if database:
+                catalog_tables = self._get_catalog_tables(cursor, db_name, database)
+                return {database: catalog_tables.get(database, {})}, errors
+            
+            schemas = self._list_server_schemas(cursor, db_name)
+            try:
+                # One tables query and one columns query cover every schema
+                catalog_tables = self._get_catalog_tables(cursor, db_name)
+            except Exception as e:
+                errors.append(f"Error getting tables for {db_name}: {e}")
+                catalog_tables = {}
+            return {schema: catalog_tables.get(schema, {}) for schema in schemas}, errors
+        except Exception as e:
+            errors.append(f"Error refreshing tables for {db_name}: {e}")
+            return None, errors
+        finally:
+            cursor.close()
+    
+    def _collect_schema_plan(self, connection, databases: List[tuple]):
+        """Read every table and column shown in the tree; runs on SchemaRefreshWorker's thread"""
+        plan = {'local': {}, 'databases': {}}
+        errors = []
+        
+        # Get all tables and their columns from the local schema in a single query
+        columns_result = connection.execute(_Q_LOCAL_COLS).fetchall()
+        for table_name, column_name, data_type in columns_result:
+            plan['local'].setdefault(table_name, []).append(f"{column_name} ({data_type})")
+        
+        # Read the connected databases concurrently, each on its own cursor; DuckDB releases
+        # the GIL while a query runs, so the wait is the slowest catalog rather than the sum
+        if databases:
+            with ThreadPoolExecutor(max_workers=min(8, len(databases))) as pool:
+                futures = [
+                    (db_name, pool.submit(self._collect_database_schemas, connection, db_name, database))
+                    for db_name, database in databases
+                ]
+                # Collect in submission order so the tree keeps the connection order
+                for db_name, future in futures:
+                    schemas, db_errors = future.result()
+                    errors.extend(db_errors)
+                    if schemas is not None:
+                        plan['databases'][db_name] = schemas
+        
+        # Fingerprint each Tables node's contents so unchanged subtrees can be left alone
+        plan['signatures'] = {'local': self._schema_signature(plan['local'])}
+        for db_name, database in databases:
+            for schema_name, tables in plan['databases'].get(db_name, {}).items():
+                schema_key = db_name if database else f"{db_name}.{schema_name}"
+                plan['signatures'][schema_key] = self._schema_signature(tables)
+        
+        return plan, errors
+    
+    def _schema_signature(self, tables: Dict[str, List[str]]) -> bytes:
+        """Return a short digest of a schema's tables and columns"""
+        return hashlib.blake2b(pickle.dumps(tables), digest_size=8).digest()
+    
+    def refresh_database_tree(self, connection_name: str = None):
+        """Refresh the database tree with current tables, reading the catalogs on a worker thread.
+        
+        With connection_name, only that connection's subtree (plus the local tables) is read and updated.
+        """
+        if self._refresh_in_flight:
+            # Fold any requests made meanwhile into one more full pass once the current refresh lands
+            self._refresh_pending = True
+            return
+        
+        self._refresh_in_flight = True
+        db_names = [connection_name] if connection_name else self.connection_manager.get_connected_databases()
+        databases = [
+            (db_name, getattr(self.connection_manager.connections.get(db_name), 'database', None))
+            for db_name in db_names
+        ]
+        self.schema_refresh_worker = SchemaRefreshWorker(self.connection, databases, self._collect_schema_plan)
+        self.schema_refresh_worker.finished.connect(functools.partial(self._apply_schema_tree, scope=connection_name))
+        self.schema_refresh_worker.start()
+    
+    def _apply_schema_tree(self, plan, errors, scope: str = None):
+        """Rebuild the database tree and autocomplete lists from a SchemaRefreshWorker plan.
+        
+        A scoped plan covers one connection; every other connection's nodes and names are left as they are.
+        """
+        self._refresh_in_flight = False
+        
+        for error in errors:
+            self.log_message(error)
+        
+        if plan is not None:
+            # Collect table names for autocomplete, per source so a scoped refresh can replace just one
+            table_names = {'local': []}
             
-            # Collect all table names for autocomplete
-            all_table_names = []
+            # Signatures of the Tables nodes as they stand after this apply
+            applied_signatures = {}
             
-            # Get all tables from the local schema
-            tables_result = self.connection.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'local'").fetchall()
+            # Which connection owns each database, for resolving USE context switches
+            db_to_conn = {}
             
-            for table_row in tables_result:
-                table_name = table_row[0]
-                all_table_names.append(f"local.{table_name}")
-                all_table_names.append(table_name)  # Also add without schema prefix
+            self.db_tree.setUpdatesEnabled(False)
+            self.db_tree.blockSignals(True)
+            try:
+                # Replace existing tables for local database if they changed
+                for table_name in plan['local']:
+                    table_names['local'].append(f"local.{table_name}")
+                    table_names['local'].append(table_name)  # Also add without schema prefix
+                signature = plan['signatures']['local']
+                if self._schema_sig.get('local') != signature:
+                    self.db_tree.set_tables('local', plan['local'])
+                applied_signatures['local'] = signature
                 
-                # Get column information
-                try:
-                    columns_result = self.connection.execute(f"DESCRIBE local.{table_name}").fetchall()
-                    columns = [f"{col[0]} ({col[1]})" for col in columns_result]
-                    self.db_tree.add_table(table_name, columns, 'local')
-                except:
-                    self.db_tree.add_table(table_name, database='local')
-            
-            # Refresh connected databases
-            connected_dbs = self.connection_manager.get_connected_databases()
-            for db_name in connected_dbs:
-                try:
-                    # Check if this connection has a specific database or connects to server
+                connected_dbs = self.connection_manager.get_connected_databases()
+                for db_name, schemas in plan['databases'].items():
+                    # Skip connections that were closed while the worker was running
+                    if db_name not in connected_dbs:
+                        continue
+                    
+                    if db_name not in self.db_tree.source_nodes:
+                        source_item = QTreeWidgetItem(self.db_tree, [f"{db_name} Connection"])
+                        self.db_tree.source_nodes[db_name] = source_item
+                    
                     conn = self.connection_manager.connections.get(db_name)
-                    if conn and not conn.database:
-                        # No specific database - create source node and list all databases
-                        if db_name not in self.db_tree.source_nodes:
-                            source_item = QTreeWidgetItem(self.db_tree, [f"{db_name} Connection"])
-                            self.db_tree.source_nodes[db_name] = source_item
-                        
-                        try:
-                            # Use the attached database connection to show databases
-                            # Try different approaches to list databases
-                            databases_result = None
-                            try:
-                                # First try SHOW DATABASES FROM attached_db
-                                databases_result = self.connection.execute(f"SHOW DATABASES FROM {db_name}").fetchall()
-                            except:
-                                try:
-                                    # Fallback: Query information_schema directly
-                                    databases_result = self.connection.execute(f"SELECT schema_name FROM {db_name}.information_schema.schemata WHERE schema_name NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')").fetchall()
-                                except:
-                                    # Last resort: try to get table schemas
-                                    databases_result = self.connection.execute(f"SELECT DISTINCT table_schema FROM {db_name}.information_schema.tables WHERE table_schema NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')").fetchall()
-                            
-                            if databases_result:
-                                for db_row in databases_result:
-                                    schema_name = db_row[0]
-                                    # Skip system databases
-                                    if schema_name.lower() in ['information_schema', 'mysql', 'performance_schema', 'sys']:
-                                        continue
-                                    
-                                    # Create database node under source
-                                    schema_key = f"{db_name}.{schema_name}"
-                                    if schema_key not in self.db_tree.database_nodes:
-                                        db_item = QTreeWidgetItem(self.db_tree.source_nodes[db_name], [schema_name])
-                                        tables_item = QTreeWidgetItem(db_item, ["Tables"])
-                                        views_item = QTreeWidgetItem(db_item, ["Views"])
-                                        
-                                        self.db_tree.database_nodes[schema_key] = db_item
-                                        self.db_tree.table_nodes[schema_key] = tables_item
-                                        self.db_tree.view_nodes[schema_key] = views_item
-                                    
-                                    # Get tables for this schema
-                                    try:
-                                        # Try different approaches to list tables
-                                        tables_result = None
-                                        try:
-                                            # First try SHOW TABLES FROM db.schema
-                                            tables_result = self.connection.execute(f"SHOW TABLES FROM {db_name}.{schema_name}").fetchall()
-                                        except:
-                                            try:
-                                                # Fallback: Query information_schema directly
-                                                tables_result = self.connection.execute(f"SELECT table_name FROM {db_name}.information_schema.tables WHERE table_schema = '{schema_name}' AND table_type = 'BASE TABLE'").fetchall()
-                                            except:
-                                                # Skip if we can't get tables
-                                                tables_result = []
-                                        
-                                        if tables_result:
-                                            for table_row in tables_result:
-                                                table_name = table_row[0]
-                                                # Skip system tables
-                                                if table_name.upper().startswith(('INNODB_', 'PERFORMANCE_', 'SYS_')):
-                                                    continue
-                                                
-                                                # Add to autocomplete list
-                                                all_table_names.append(f"{db_name}.{schema_name}.{table_name}")
-                                                all_table_names.append(f"{schema_name}.{table_name}")
-                                                all_table_names.append(table_name)  # Also add without prefixes
-                                                
-                                                # Create table item directly under Tables node
-                                                table_item = QTreeWidgetItem(self.db_tree.table_nodes[schema_key], [table_name])
-                                                table_item.setData(0, Qt.ItemDataRole.UserRole, schema_key)
-                                        
-                                                # Add columns as children of table
-                                                try:
-                                                    # Try different approaches to get column info
-                                                    columns_result = None
-                                                    try:
-                                                        # First try DESCRIBE
-                                                        columns_result = self.connection.execute(f"DESCRIBE {db_name}.{schema_name}.{table_name}").fetchall()
-                                                    except:
-                                                        try:
-                                                            # Fallback: Query information_schema for columns
-                                                            columns_result = self.connection.execute(f"SELECT column_name, data_type FROM {db_name}.information_schema.columns WHERE table_schema = '{schema_name}' AND table_name = '{table_name}' ORDER BY ordinal_position").fetchall()
-                                                        except:
-                                                            # Skip columns if we can't get them
-                                                            columns_result = []
-                                                    
-                                                    if columns_result:
-                                                        for col in columns_result:
-                                                            col_item = QTreeWidgetItem(table_item, [f"{col[0]} ({col[1]})"])
-                                                except:
-                                                    pass  # No columns info available
-                                    except Exception as e:
-                                        self.log_message(f"Error getting tables for schema {schema_name}: {e}")
-                        except Exception as e:
-                            self.log_message(f"Error listing databases for {db_name}: {e}")
-                    else:
-                        # Specific database connection - create source and database nodes
-                        if db_name not in self.db_tree.source_nodes:
-                            source_item = QTreeWidgetItem(self.db_tree, [f"{db_name} Connection"])
-                            self.db_tree.source_nodes[db_name] = source_item
+                    server_level = not (conn and conn.database)
+                    db_table_names = table_names[db_name] = []
+                    
+                    for schema_name, tables in schemas.items():
+                        db_to_conn.setdefault(schema_name, db_name)
                         
-                        if db_name not in self.db_tree.database_nodes:
-                            db_item = QTreeWidgetItem(self.db_tree.source_nodes[db_name], [conn.database or db_name])
+                        # Server-level schemas are keyed db.schema, a specific database by the connection name
+                        schema_key = f"{db_name}.{schema_name}" if server_level else db_name
+                        node_created = schema_key not in self.db_tree.database_nodes
+                        if node_created:
+                            db_item = QTreeWidgetItem(self.db_tree.source_nodes[db_name], [schema_name])
                             tables_item = QTreeWidgetItem(db_item, ["Tables"])
                             views_item = QTreeWidgetItem(db_item, ["Views"])
                             
-                            self.db_tree.database_nodes[db_name] = db_item
-                            self.db_tree.table_nodes[db_name] = tables_item
-                            self.db_tree.view_nodes[db_name] = views_item
-                        
-                        # Get tables for this database
-                        try:
-                            tables_result = self.connection.execute(f"SHOW TABLES FROM {db_name}").fetchall()
-                            table_column = 0  # SHOW TABLES returns table names in first column
-                        except:
-                            # Fallback to information_schema query - filter out system tables
-                            tables_result = self.connection.execute(
-                                f"SELECT table_name FROM {db_name}.information_schema.tables "
-                                f"WHERE table_schema = '{conn.database or db_name}' AND table_schema NOT IN ('information_schema', 'mysql', 'performance_schema', 'sys')"
-                            ).fetchall()
-                            table_column = 0
+                            self.db_tree.database_nodes[schema_key] = db_item
+                            self.db_tree.table_nodes[schema_key] = tables_item
+                            self.db_tree.view_nodes[schema_key] = views_item
                         
-                        for table_row in tables_result:
-                            table_name = table_row[table_column]
-                            # Skip system tables that might still appear
-                            if table_name.upper().startswith(('INNODB_', 'PERFORMANCE_', 'SYS_')):
-                                continue
-                            
+                        for table_name in tables:
                             # Add to autocomplete list
-                            all_table_names.append(f"{db_name}.{table_name}")
-                            all_table_names.append(table_name)  # Also add without database prefix
-                            
-                            # Create table item directly under Tables node
-                            table_item = QTreeWidgetItem(self.db_tree.table_nodes[db_name], [table_name])
-                            table_item.setData(0, Qt.ItemDataRole.UserRole, db_name)
-                            
-                            # Add columns as children of table
-                            try:
-                                columns_result = self.connection.execute(f"DESCRIBE {db_name}.{conn.database or db_name}.{table_name}").fetchall()
-                                for col in columns_result:
-                                    col_item = QTreeWidgetItem(table_item, [f"{col[0]} ({col[1]})"])
-                            except:
-                                pass  # No columns info available
-                except Exception as e:
-                    self.log_message(f"Error refreshing tables for {db_name}: {e}")
-            
-            # Store the collected table names for use in new tabs
-            self.current_table_names = all_table_names
-            
-            # Update SQL editor autocomplete with all collected table names for all tabs
-            self.update_all_editors_table_names(all_table_names)
+                            if server_level:
+                                db_table_names.append(f"{db_name}.{schema_name}.{table_name}")
+                                db_table_names.append(f"{schema_name}.{table_name}")
+                            else:
+                                db_table_names.append(f"{db_name}.{table_name}")
+                            db_table_names.append(table_name)  # Also add without prefixes
                         
-        except Exception as e:
-            self.log_message(f"Error refreshing database tree: {e}")
+                        # Rebuild only subtrees whose contents changed; replacing rather than appending
+                        # keeps repeated refreshes from duplicating tables
+                        signature = plan['signatures'].get(schema_key)
+                        if node_created or signature is None or self._schema_sig.get(schema_key) != signature:
+                            self.db_tree.set_tables(schema_key, tables)
+                        applied_signatures[schema_key] = signature
+                
+                if scope is None:
+                    self._schema_sig = applied_signatures
+                    self._db_to_conn = db_to_conn
+                    self._table_names_by_source = table_names
+                else:
+                    self._schema_sig.update(applied_signatures)
+                    self._db_to_conn = {db: conn for db, conn in self._db_to_conn.items() if conn != scope}
+                    self._db_to_conn.update(db_to_conn)
+                    self._table_names_by_source.update(table_names)
+            finally:
+                self.db_tree.blockSignals(False)
+                self.db_tree.setUpdatesEnabled(True)
+            
+            self._publish_table_names()
+        
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_database_tree()
             
+    def _publish_table_names(self):
+        """Hand the table names of every source to the autocomplete of all editors"""
+        # Store the collected table names for use in new tabs
+        all_table_names = [name for names in self._table_names_by_source.values() for name in names]
+        self.current_table_names = all_table_names
+        
+        # Update SQL editor autocomplete with all collected table names for all tabs
+        self.update_all_editors_table_names(all_table_names)
+    
+    def _partition_use(self, query: str):
+        """Split a script into (databases named by USE statements, remaining SQL joined with '; ')"""
+        use_dbs = []
+        statements = []
+        for stmt in _iter_statements(query):
+            stmt = stmt.strip()
+            if not stmt:
+                continue
+            # Only statements that start with USE need the full pattern match
+            match = _USE_RE.match(stmt) if stmt[:3].upper() == 'USE' else None
+            if match:
+                use_dbs.append(match.group(1))
+            else:
+                statements.append(stmt)
+        return use_dbs, '; '.join(statements)
+    
     def execute_query(self):
         """Execute the SQL query in the editor (selected text if available, otherwise full text)"""
         current_editor = self.get_current_editor()
@@ -4466,54 +5020,15 @@ SHOW TABLES;
             return
         
         # Check if there's selected text, if so, execute only the selection
-        if current_editor.has_selection():
-            query = current_editor.get_selected_text().strip()
-            self.log_message("Executing selected query...")
-        else:
-            query = current_editor.get_text().strip()
-            self.log_message("Executing full query...")
+        has_selection = current_editor.has_selection()
+        text = current_editor.get_selected_text() if has_selection else current_editor.get_text()
+        query = text.strip()
         
         if not query:
             self.log_message("No query to execute")
             return
         
-        # Handle multi-statement queries by splitting on semicolons
-        statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
-        
-        if not statements:
-            self.log_message("No valid statements to execute")
-            return
-        
-        # Process USE statements first
-        non_use_statements = []
-        for stmt in statements:
-            if stmt.upper().startswith('USE '):
-                try:
-                    # Extract database name
-                    use_part = stmt[4:].strip()
-                    db_name = use_part.strip()
-                    
-                    # Update the current database context
-                    self.current_database = db_name
-                    self.update_database_context_display()
-                    self.log_message(f"Database context switched to '{db_name}'")
-                except Exception as e:
-                    self.log_message(f"Error processing USE statement: {e}")
-                    return
-            else:
-                non_use_statements.append(stmt)
-        
-        # If there are non-USE statements, execute them
-        if non_use_statements:
-            # Join the remaining statements
-            remaining_query = '; '.join(non_use_statements)
-            
-            # Execute with pagination (default page size and first page)
-            self.execute_paginated_query(remaining_query, 0, 1000)
-        else:
-            # Only USE statements were executed
-            self.progress_bar.setVisible(False)
-            self.query_stats_label.setText("Ready")
+        self._run_query_text(query, 'selected' if has_selection else 'full')
     
     def execute_selected_query(self):
         """Execute only the selected text as a query"""
@@ -4532,39 +5047,29 @@ SHOW TABLES;
             self.log_message("Selected text is empty")
             return
         
-        self.log_message("Executing selected query...")
+        self._run_query_text(query, 'selected')
+    
+    def _run_query_text(self, query: str, source_label: str):
+        """Apply the USE statements in a script and execute the rest; source_label is 'selected' or 'full'"""
+        self.log_message(f"Executing {source_label} query...")
         
-        # Handle multi-statement queries by splitting on semicolons
-        statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
+        # Handle multi-statement queries by splitting off USE statements
+        use_dbs, remaining_query = self._partition_use(query)
         
-        if not statements:
-            self.log_message("No valid statements in selection")
+        if not use_dbs and not remaining_query:
+            self.log_message("No valid statements in selection" if source_label == 'selected' else "No valid statements to execute")
             return
         
         # Process USE statements first
-        non_use_statements = []
-        for stmt in statements:
-            if stmt.upper().startswith('USE '):
-                try:
-                    # Extract database name
-                    use_part = stmt[4:].strip()
-                    db_name = use_part.strip()
-                    
-                    # Update the current database context
-                    self.current_database = db_name
-                    self.update_database_context_display()
-                    self.log_message(f"Database context switched to '{db_name}'")
-                except Exception as e:
-                    self.log_message(f"Error processing USE statement: {e}")
-                    return
-            else:
-                non_use_statements.append(stmt)
+        for db_name in use_dbs:
+            # Update the current database context
+            self.current_database = db_name
+            self._drop_schema_cache()
+            self.update_database_context_display()
+            self.log_message(f"Database context switched to '{db_name}'")
         
         # If there are non-USE statements, execute them
-        if non_use_statements:
-            # Join the remaining statements
-            remaining_query = '; '.join(non_use_statements)
-            
+        if remaining_query:
             # Execute with pagination (default page size and first page)
             self.execute_paginated_query(remaining_query, 0, 1000)
         else:
@@ -4581,13 +5086,17 @@ SHOW TABLES;
         if current_query_tab in self.query_results_tables:
             # Store results data for this query tab
             current_page = getattr(self.query_worker, 'page_number', 0)
-            self.query_results_tables[current_query_tab] = {
-                'data': data,
-                'columns': columns,
-                'total_count': total_count,
-                'current_page': current_page,
-                'query': query
-            }
+            with self._results_lock:
+                self.query_results_tables[current_query_tab] = {
+                    'data': data,
+                    'columns': columns,
+                    'total_count': total_count,
+                    'current_page': current_page,
+                    'query': query,
+                    'processed_query': getattr(self.query_worker, 'processed_query', query),
+                    'tab_name': self.query_tabs.tabText(current_query_tab),
+                    'version': next(self._results_versions)
+                }
             
             # Display results in the single results table
             self.single_results_table.display_results(data, columns, total_count, current_page, query)
@@ -4612,32 +5121,41 @@ SHOW TABLES;
         # Hide progress
         self.progress_bar.setVisible(False)
         
-        # Always refresh database tree to ensure autocomplete is up to date
-        # This ensures that all tabs have current table information for autocomplete
-        self.refresh_database_tree()
+        # Only DDL can change the tables shown in the tree and offered by autocomplete
+        if self._is_ddl(query):
+            self._invalidate_schema_cache(query)
+            self.refresh_database_tree()
+    
+    def _is_ddl(self, sql: str) -> bool:
+        """Return True if any statement in sql is DDL"""
+        return any(
+            _DDL_RE.match(_LEADING_COMMENTS_RE.sub('', stmt, count=1))
+            for stmt in _iter_statements(sql)
+        )
+    
+    def _invalidate_schema_cache(self, sql: str):
+        """Drop cached listings for the current connection and any attached database named in sql"""
+        sql_lower = sql.lower()
+        current_connection = self.current_connection
+        self._drop_schema_cache(lambda db_name: db_name == current_connection or db_name.lower() in sql_lower)
+        
+        # A schema change may have created or dropped databases on the server
+        for conn_name in self.connection_manager.get_connected_databases():
+            if conn_name == self.current_connection or conn_name.lower() in sql_lower:
+                self.connection_manager.forget_dsn_schemas(conn_name)
         
     def on_query_error(self, error_msg: str):
         """Handle query execution error"""
         # Check if this is a database context switch message
         if "Database context switched to" in error_msg:
             # Extract database name from the message
-            import re
-            match = re.search(r"Database context switched to '([^']+)'", error_msg)
+            match = _CTX_RE.search(error_msg)
             if match:
                 new_db = match.group(1)
                 self.current_database = new_db
                 
                 # Find which connection contains this database
-                self.current_connection = 'local'  # Default
-                for conn_name in self.connection_manager.get_connected_databases():
-                    try:
-                        # Try to find the database in this connection
-                        result = self.connection.execute(f"SELECT schema_name FROM {conn_name}.information_schema.schemata WHERE schema_name = '{new_db}'").fetchall()
-                        if result:
-                            self.current_connection = conn_name
-                            break
-                    except:
-                        continue
+                self.current_connection = self._db_to_conn.get(new_db, 'local')
                 
                 self.update_database_context_display()
                 self.log_message(f"Database context switched to '{new_db}' (connection: {self.current_connection})")
@@ -4676,242 +5194,225 @@ SHOW TABLES;
         current_query_index = self.query_tabs.currentIndex()
         if current_query_index in self.query_results_tables:
             self.query_results_tables[current_query_index].clear_results()
+        self._log_queue.clear()
         self.messages_text.clear()
         self.query_stats_label.setText("Ready")
         
-    def export_results_excel(self):
-        """Export query results to Excel file"""
+    def _get_export_results(self):
+        """Return the current query tab's cached results, or None after warning that there is nothing to export"""
         current_query_index = self.query_tabs.currentIndex()
-        if current_query_index not in self.query_results_tables:
+        results_data = self.query_results_tables.get(current_query_index)
+        if results_data is None:
             QMessageBox.warning(self, "Warning", "No query results to export.")
-            return
+            return None
             
-        if self.single_results_table.table.rowCount() == 0:
+        if len(results_data['data']) == 0:
             QMessageBox.warning(self, "Warning", "No data to export.")
-            return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Results as Excel", "", "Excel Files (*.xlsx);;All Files (*)"
-        )
+            return None
         
-        if not file_path:
+        return results_data
+    
+    def _ask_export_full_result(self, results_data) -> Optional[bool]:
+        """Ask whether to export the displayed page or the full result; returns None if cancelled"""
+        total_count = results_data.get('total_count', -1)
+        page_rows = len(results_data['data'])
+        if total_count <= page_rows:
+            # Everything is already on this page (or the result was not paginated)
+            return False
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("Export Results")
+        box.setText(f"The query returned {total_count} rows and {page_rows} are shown on this page.\n"
+                    "What would you like to export?")
+        page_button = box.addButton("Current Page", QMessageBox.ButtonRole.AcceptRole)
+        full_button = box.addButton("Full Result", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        if self._full_export_query(results_data) is None:
+            # Re-running anything but a final SELECT would repeat the script's side effects
+            full_button.setEnabled(False)
+            box.setInformativeText("Full Result is only available when the query ends with a SELECT statement.")
+        box.exec()
+        
+        if box.clickedButton() is full_button:
+            return True
+        if box.clickedButton() is page_button:
+            return False
+        return None
+    
+    def _full_export_query(self, results_data) -> Optional[str]:
+        """Return the last statement of a tab's query if it is a SELECT, otherwise None"""
+        query = results_data.get('processed_query') or results_data['query']
+        statements = [stmt.strip() for stmt in _iter_statements(query) if stmt.strip()]
+        if statements and _SELECT_RE.match(_LEADING_COMMENTS_RE.sub('', statements[-1], count=1)):
+            return statements[-1]
+        return None
+    
+    @contextmanager
+    def _export_batches(self, results_data, full_result: bool):
+        """Yield (schema, record batches) for the cached page, or stream the whole query result from DuckDB"""
+        if not full_result:
+            data = results_data['data']
+            yield data.schema, data.to_batches()
             return
-            
+        
+        # Only the final SELECT is re-run; earlier statements in the script already took effect
+        query = self._full_export_query(results_data)
+        if query is None:
+            raise Exception("Full result export needs a query that ends with a SELECT statement")
+        
+        # Re-run it on a cursor of its own and pull it in Arrow record batches,
+        # so memory stays bounded by the batch size rather than the result size
+        cursor = self.connection.cursor()
         try:
-            import pandas as pd
-            
-            # Get data from the table
-            table = self.single_results_table.table
-            rows = table.rowCount()
-            cols = table.columnCount()
-            
-            # Get column headers
-            headers = []
-            for col in range(cols):
-                header_item = table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"Column_{col}")
-            
-            # Get data
-            data = []
-            for row in range(rows):
-                row_data = []
-                for col in range(cols):
-                    item = table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-            
-            # Create DataFrame and export
-            df = pd.DataFrame(data, columns=headers)
-            df.to_excel(file_path, index=False, engine='openpyxl')
-            
-            self.log_message(f"Results exported to Excel: {file_path}")
-            QMessageBox.information(self, "Success", f"Results exported successfully to:\n{file_path}")
-            
-        except ImportError:
-            QMessageBox.critical(
-                self, "Error", 
-                "pandas and openpyxl are required for Excel export.\n"
-                "Please install them using:\n"
-                "pip install pandas openpyxl"
-            )
-        except Exception as e:
-            error_msg = f"Error exporting to Excel: {str(e)}"
-            self.log_message(error_msg)
-            QMessageBox.critical(self, "Export Error", error_msg)
+            # A new cursor starts in the default schema; unqualified names resolve against local
+            cursor.execute("USE local")
+            cursor.execute(query)
+            description = cursor.description
+            reader = cursor.to_arrow_reader(EXPORT_BATCH_ROWS)
+            schema = duckdb_result_schema(reader.schema, description)
+            yield schema, (pa.RecordBatch.from_arrays(batch.columns, schema=schema) for batch in reader)
+        finally:
+            cursor.close()
     
-    def export_results_csv(self):
-        """Export query results to CSV file"""
-        current_query_index = self.query_tabs.currentIndex()
-        if current_query_index not in self.query_results_tables:
-            QMessageBox.warning(self, "Warning", "No query results to export.")
+    def _write_excel_export(self, file_path: str, results_data, full_result: bool):
+        """Write results to an .xlsx file with xlsxwriter's constant-memory writer, one row at a time"""
+        import xlsxwriter
+        
+        with self._export_batches(results_data, full_result) as (schema, batches):
+            # Excel has no time zones, so timezone-aware timestamps are written as their wall-clock time
+            workbook = xlsxwriter.Workbook(file_path, {
+                'constant_memory': True,
+                'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+                'remove_timezone': True,
+                # Results are data, not spreadsheet input: NaN/Inf become #NUM!/#DIV/0! cells
+                # instead of raising, and text is never turned into formulas or hyperlinks
+                'nan_inf_to_errors': True,
+                'strings_to_formulas': False,
+                'strings_to_urls': False
+            })
+            try:
+                worksheet = workbook.add_worksheet()
+                # constant_memory flushes a row as soon as the next one starts, so every row
+                # must be written whole and in order: header first, then the data rows
+                worksheet.write_row(0, 0, schema.names)
+                row_index = 1
+                for batch in batches:
+                    for row in iter_result_rows(text_export_batch(batch)):
+                        worksheet.write_row(row_index, 0, row)
+                        row_index += 1
+            finally:
+                workbook.close()
+    
+    def _write_csv_export(self, file_path: str, results_data, full_result: bool):
+        """Write results to a CSV file with Arrow's vectorized CSV writer"""
+        from pyarrow import csv as pacsv
+        
+        with self._export_batches(results_data, full_result) as (schema, batches):
+            # Arrow's CSV writer rejects nested and interval columns, so those are written as text
+            with pacsv.CSVWriter(file_path, text_export_schema(schema)) as writer:
+                for batch in batches:
+                    writer.write_batch(text_export_batch(batch))
+    
+    def _write_json_export(self, file_path: str, results_data, full_result: bool):
+        """Write results to a JSON file as an array of row objects, one batch at a time"""
+        with self._export_batches(results_data, full_result) as (schema, batches):
+            with open(file_path, 'w', encoding='utf-8') as jsonfile:
+                jsonfile.write('[')
+                separator = '\n  '
+                for batch in batches:
+                    for row in iter_result_rows(batch):
+                        # Dates, decimals etc. fall back to str()
+                        jsonfile.write(separator + json.dumps(dict(zip(schema.names, row)), ensure_ascii=False, default=str))
+                        separator = ',\n  '
+                jsonfile.write('\n]\n')
+    
+    def _write_parquet_export(self, file_path: str, results_data, full_result: bool):
+        """Write results to a Parquet file one record batch at a time"""
+        import pyarrow.parquet as pq
+        
+        with self._export_batches(results_data, full_result) as (schema, batches):
+            with pq.ParquetWriter(file_path, schema, compression='snappy') as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        
+    def _export_results(self, label: str, file_filter: str, write_export, missing_dependency_msg: str = None):
+        """Ask for the export scope and file, then write the results on the global thread pool"""
+        results_data = self._get_export_results()
+        if results_data is None:
             return
-            
-        if self.single_results_table.table.rowCount() == 0:
-            QMessageBox.warning(self, "Warning", "No data to export.")
+        
+        full_result = self._ask_export_full_result(results_data)
+        if full_result is None:
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Results as CSV", "", "CSV Files (*.csv);;All Files (*)"
+            self, f"Export Results as {label}", "", file_filter
         )
         
         if not file_path:
             return
-            
-        try:
-            import csv
-            
-            # Get data from the table
-            table = self.single_results_table.table
-            rows = table.rowCount()
-            cols = table.columnCount()
-            
-            # Get column headers
-            headers = []
-            for col in range(cols):
-                header_item = table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"Column_{col}")
-            
-            # Write to CSV file
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write headers
-                writer.writerow(headers)
-                
-                # Write data
-                for row in range(rows):
-                    row_data = []
-                    for col in range(cols):
-                        item = table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
-            
-            self.log_message(f"Results exported to CSV: {file_path}")
-            QMessageBox.information(self, "Success", f"Results exported successfully to:\n{file_path}")
-            
-        except Exception as e:
-            error_msg = f"Error exporting to CSV: {str(e)}"
-            self.log_message(error_msg)
-            QMessageBox.critical(self, "Export Error", error_msg)
+        
+        worker = ExportWorker(write_export, file_path, results_data, full_result, label, missing_dependency_msg)
+        worker.signals.finished.connect(functools.partial(self.on_export_finished, worker, label))
+        worker.signals.error.connect(functools.partial(self.on_export_error, worker))
+        # Keep the Python wrapper (and its signals object) alive until the task reports back
+        self._export_workers.add(worker)
+        self.log_message(f"Exporting results to {label}: {file_path}...")
+        QThreadPool.globalInstance().start(worker)
+    
+    def on_export_finished(self, worker, label: str, file_path: str):
+        """Handle a completed export"""
+        self._export_workers.discard(worker)
+        self.log_message(f"Results exported to {label}: {file_path}")
+        QMessageBox.information(self, "Success", f"Results exported successfully to:\n{file_path}")
+    
+    def on_export_error(self, worker, error_msg: str):
+        """Handle a failed export"""
+        self._export_workers.discard(worker)
+        self.log_message(error_msg)
+        QMessageBox.critical(self, "Export Error", error_msg)
+        
+    def export_results_excel(self):
+        """Export query results to Excel file"""
+        self._export_results(
+            "Excel", "Excel Files (*.xlsx);;All Files (*)", self._write_excel_export,
+            "xlsxwriter is required for Excel export.\n"
+            "Please install it using:\n"
+            "pip install xlsxwriter"
+        )
+    
+    def export_results_csv(self):
+        """Export query results to CSV file"""
+        self._export_results("CSV", "CSV Files (*.csv);;All Files (*)", self._write_csv_export)
     
     def export_results_json(self):
         """Export query results to JSON file"""
-        current_query_index = self.query_tabs.currentIndex()
-        if current_query_index not in self.query_results_tables:
-            QMessageBox.warning(self, "Warning", "No query results to export.")
-            return
-            
-        if self.single_results_table.table.rowCount() == 0:
-            QMessageBox.warning(self, "Warning", "No data to export.")
-            return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Results as JSON", "", "JSON Files (*.json);;All Files (*)"
-        )
-        
-        if not file_path:
-            return
-            
-        try:
-            import json
-            
-            # Get data from the table
-            table = self.single_results_table.table
-            rows = table.rowCount()
-            cols = table.columnCount()
-            
-            # Get column headers
-            headers = []
-            for col in range(cols):
-                header_item = table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"Column_{col}")
-            
-            # Get data as list of dictionaries
-            data = []
-            for row in range(rows):
-                row_dict = {}
-                for col in range(cols):
-                    item = table.item(row, col)
-                    row_dict[headers[col]] = item.text() if item else ""
-                data.append(row_dict)
-            
-            # Write to JSON file
-            with open(file_path, 'w', encoding='utf-8') as jsonfile:
-                json.dump(data, jsonfile, indent=2, ensure_ascii=False)
-            
-            self.log_message(f"Results exported to JSON: {file_path}")
-            QMessageBox.information(self, "Success", f"Results exported successfully to:\n{file_path}")
-            
-        except Exception as e:
-            error_msg = f"Error exporting to JSON: {str(e)}"
-            self.log_message(error_msg)
-            QMessageBox.critical(self, "Export Error", error_msg)
+        self._export_results("JSON", "JSON Files (*.json);;All Files (*)", self._write_json_export)
     
     def export_results_parquet(self):
         """Export query results to Parquet file"""
-        current_query_index = self.query_tabs.currentIndex()
-        if current_query_index not in self.query_results_tables:
-            QMessageBox.warning(self, "Warning", "No query results to export.")
-            return
-            
-        if self.single_results_table.table.rowCount() == 0:
-            QMessageBox.warning(self, "Warning", "No data to export.")
-            return
-            
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Export Results as Parquet", "", "Parquet Files (*.parquet);;All Files (*)"
+        self._export_results(
+            "Parquet", "Parquet Files (*.parquet);;All Files (*)", self._write_parquet_export,
+            "pyarrow is required for Parquet export.\n"
+            "Please install it using:\n"
+            "pip install pyarrow"
         )
         
-        if not file_path:
-            return
-            
-        try:
-            import pandas as pd
-            
-            # Get data from the table
-            table = self.single_results_table.table
-            rows = table.rowCount()
-            cols = table.columnCount()
-            
-            # Get column headers
-            headers = []
-            for col in range(cols):
-                header_item = table.horizontalHeaderItem(col)
-                headers.append(header_item.text() if header_item else f"Column_{col}")
-            
-            # Get data
-            data = []
-            for row in range(rows):
-                row_data = []
-                for col in range(cols):
-                    item = table.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-            
-            # Create DataFrame and export to Parquet
-            df = pd.DataFrame(data, columns=headers)
-            df.to_parquet(file_path, index=False, engine='pyarrow')
-            
-            self.log_message(f"Results exported to Parquet: {file_path}")
-            QMessageBox.information(self, "Success", f"Results exported successfully to:\n{file_path}")
-            
-        except ImportError:
-            QMessageBox.critical(
-                self, "Error", 
-                "pandas and pyarrow are required for Parquet export.\n"
-                "Please install them using:\n"
-                "pip install pandas pyarrow"
-            )
-        except Exception as e:
-            error_msg = f"Error exporting to Parquet: {str(e)}"
-            self.log_message(error_msg)
-            QMessageBox.critical(self, "Export Error", error_msg)
-        
     def log_message(self, message: str):
         """Add a message to the messages log"""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.messages_text.append(f"[{timestamp}] {message}")
+        # Queue the message and let one timer tick append everything logged in the meantime,
+        # so bursts of progress messages cost a single QTextEdit update
+        self._log_queue.append(f"[{time.strftime('%H:%M:%S')}] {message}")
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+    
+    def _flush_log_messages(self):
+        """Append all queued log messages to the messages log"""
+        messages = []
+        while self._log_queue:
+            messages.append(self._log_queue.popleft())
+        if messages:
+            self.messages_text.append('\n'.join(messages))
         
     def show_about(self):
         """Show about dialog"""
@@ -4952,40 +5453,60 @@ SHOW TABLES;
         """Update the connection menu with available connections"""
         self.connection_menu.clear()
         
+        # Actions are owned by the window, so clearing the menu keeps them; drop those of deleted connections
         connections = self.connection_manager.get_connection_names()
+        for conn_name in [name for name in self._conn_action_cache if name not in connections]:
+            for action in self._conn_action_cache.pop(conn_name):
+                action.deleteLater()
+        
         if not connections:
-            no_conn_action = QAction('No connections configured', self)
-            no_conn_action.setEnabled(False)
-            self.connection_menu.addAction(no_conn_action)
+            if self._no_conn_action is None:
+                self._no_conn_action = QAction('No connections configured', self)
+                self._no_conn_action.setEnabled(False)
+            self.connection_menu.addAction(self._no_conn_action)
             return
         
         for conn_name in connections:
             conn = self.connection_manager.connections[conn_name]
             
+            actions = self._conn_action_cache.get(conn_name)
+            if actions is None:
+                # Slots are bound once, when the connection's actions are first created
+                connect_action = QAction(self)
+                connect_action.triggered.connect(functools.partial(self.toggle_database_connection, conn_name))
+                
+                edit_action = QAction('Edit...', self)
+                edit_action.triggered.connect(functools.partial(self.edit_database_connection, conn_name))
+                
+                delete_action = QAction('Delete', self)
+                delete_action.triggered.connect(functools.partial(self.delete_database_connection, conn_name))
+                
+                actions = self._conn_action_cache[conn_name] = (connect_action, edit_action, delete_action)
+            connect_action, edit_action, delete_action = actions
+            
             # Create submenu for each connection
             conn_submenu = self.connection_menu.addMenu(conn_name)
             
             # Connect/Disconnect action
-            if conn.is_connected:
-                connect_action = QAction('Disconnect', self)
-                connect_action.triggered.connect(lambda checked, name=conn_name: self.disconnect_database(name))
-            else:
-                connect_action = QAction('Connect', self)
-                connect_action.triggered.connect(lambda checked, name=conn_name: self.connect_database(name))
+            connect_action.setText('Disconnect' if conn.is_connected else 'Connect')
             conn_submenu.addAction(connect_action)
             
             conn_submenu.addSeparator()
             
             # Edit action
-            edit_action = QAction('Edit...', self)
-            edit_action.triggered.connect(lambda checked, name=conn_name: self.edit_database_connection(name))
             conn_submenu.addAction(edit_action)
             
             # Delete action
-            delete_action = QAction('Delete', self)
-            delete_action.triggered.connect(lambda checked, name=conn_name: self.delete_database_connection(name))
             conn_submenu.addAction(delete_action)
     
+    def toggle_database_connection(self, connection_name: str):
+        """Connect to a database, or disconnect if it is already connected"""
+        conn = self.connection_manager.connections.get(connection_name)
+        if conn and conn.is_connected:
+            self.disconnect_database(connection_name)
+        else:
+            self.connect_database(connection_name)
+    
     def connect_database(self, connection_name: str):
         """Connect to a database"""
         if self.connection_manager.connect_database(connection_name):
@@ -4996,30 +5517,43 @@ SHOW TABLES;
             
             # Get the default database for this connection
             conn_info = self.connection_manager.connections.get(connection_name)
-            if conn_info and conn_info.database:
-                self.current_database = conn_info.database
+            if conn_info:
+                self.current_database = conn_info.database or conn_info.default_schema or self._probe_first_schema(conn_info)
             else:
-                # Try to get the first available database
-                try:
-                    databases = self.connection.execute(f"SELECT schema_name FROM {connection_name}.information_schema.schemata LIMIT 1").fetchall()
-                    if databases:
-                        self.current_database = databases[0][0]
-                    else:
-                        self.current_database = 'main'  # fallback
-                except:
-                    self.current_database = 'main'  # fallback
+                self.current_database = 'main'  # fallback
+            self._db_to_conn[self.current_database] = connection_name
             
             self.update_database_context_display()
             self.update_connection_menu()
-            self.refresh_database_tree()
+            # Only the new connection's subtree needs reading; the rest of the tree is unchanged
+            self._drop_schema_cache(lambda db_name: db_name == connection_name)
+            self.refresh_database_tree(connection_name)
         else:
             self.log_message(f"Failed to connect to {connection_name}")
             QMessageBox.warning(self, "Connection Error", f"Failed to connect to {connection_name}")
     
+    def _probe_first_schema(self, conn_info: DatabaseConnection) -> str:
+        """Return the first database of a server-level connection, remembering it for reconnects"""
+        # Connections to the same server share one listing
+        databases = self.connection_manager.get_dsn_schemas(conn_info)
+        if databases is None:
+            # Try to get the first available database
+            try:
+                databases = self._list_server_schemas(self.connection, conn_info.name)
+            except Exception:
+                return 'main'  # fallback
+            if databases:
+                self.connection_manager.set_dsn_schemas(conn_info, databases)
+        if not databases:
+            return 'main'  # fallback
+        conn_info.default_schema = databases[0]
+        return conn_info.default_schema
+    
     def disconnect_database(self, connection_name: str):
         """Disconnect from a database"""
         self.connection_manager.disconnect_database(connection_name)
         self.log_message(f"Disconnected from {connection_name}")
+        self._db_to_conn = {db: conn for db, conn in self._db_to_conn.items() if conn != connection_name}
         
         # Reset connection context to local if we were using this connection
         if self.current_connection == connection_name:
@@ -5028,9 +5562,13 @@ SHOW TABLES;
             self.update_database_context_display()
         
         self.update_connection_menu()
-        # Remove the database from the tree
-        self.db_tree.remove_database(connection_name)
-        self.refresh_database_tree()
+        
+        # Remove the database from the tree along with what was cached for it; the rest of the tree is unchanged
+        for key in self.db_tree.remove_database(connection_name):
+            self._schema_sig.pop(key, None)
+        self._drop_schema_cache(lambda db_name: db_name == connection_name)
+        if self._table_names_by_source.pop(connection_name, None) is not None:
+            self._publish_table_names()
     
     def edit_database_connection(self, connection_name: str):
         """Edit an existing database connection"""
@@ -5050,19 +5588,22 @@ SHOW TABLES;
             # If the name changed, we need to handle it specially
             new_name = conn_data.name
             if new_name != connection_name:
-                # Check if new name already exists
+                # Keep the original type; SSL is on whenever any certificate is given
+                conn_data.db_type = conn.db_type
+                conn_data.use_ssl = bool(conn_data.ssl_cert or conn_data.ssl_key or conn_data.ssl_ca)
+                
                 if new_name in self.connection_manager.connections:
                     QMessageBox.warning(self, "Error", f"Connection '{new_name}' already exists")
                     return
                 
-                # Remove old connection and add new one
-                self.connection_manager.remove_connection(connection_name)
-                self.connection_manager.add_connection(
-                    conn_data.name, conn_data.host, conn_data.port,
-                    conn_data.database, conn_data.username, conn_data.password,
-                    conn_data.ssl_cert, conn_data.ssl_key, conn_data.ssl_ca,
-                    conn.db_type
-                )
+                # Disconnect through the GUI so the tree node, cached listings and context under the old name go too
+                if conn.is_connected:
+                    self.disconnect_database(connection_name)
+                
+                # Move the connection to its new name; the manager re-checks the name under its lock
+                if not self.connection_manager.rename_connection(connection_name, conn_data):
+                    QMessageBox.warning(self, "Error", f"Connection '{new_name}' already exists")
+                    return
             else:
                 # Update existing connection
                 conn.host = conn_data.host
@@ -5073,9 +5614,10 @@ SHOW TABLES;
                 conn.ssl_cert = conn_data.ssl_cert
                 conn.ssl_key = conn_data.ssl_key
                 conn.ssl_ca = conn_data.ssl_ca
+                conn.default_schema = ''  # May point somewhere else now
+                self.connection_manager.save_connections()
             
-            # Save connections and update UI
-            self.connection_manager.save_connections()
+            # rename_connection already saved; just refresh the UI
             self.update_connection_menu()
             self.log_message(f"Updated connection '{new_name}'")
     
@@ -5103,9 +5645,17 @@ SHOW TABLES;
     
     def apply_theme(self, theme_name: str):
         """Apply a theme to the application"""
+        # Re-selecting the active theme would only re-highlight every editor for nothing
+        if theme_name == self._applied_theme:
+            return
+        
         stylesheet = self.theme_manager.get_theme_stylesheet(theme_name)
-        self.setStyleSheet(stylesheet)
+        # setStyleSheet re-polishes every widget, so skip it when the stylesheet is unchanged
+        if stylesheet != self._current_qss:
+            self.setStyleSheet(stylesheet)
+            self._current_qss = stylesheet
         self.theme_manager.set_theme(theme_name)
+        self._applied_theme = theme_name
         
         # Apply theme to all SQL editors
         if hasattr(self, 'query_tabs'):
@@ -5115,6 +5665,18 @@ SHOW TABLES;
     
     def closeEvent(self, event):
         """Handle application close event"""
+        # Let an in-flight tree refresh finish before its connection goes away
+        if self.schema_refresh_worker is not None:
+            self.schema_refresh_worker.wait()
+        
+        # Write any connection changes still waiting on the save thread
+        self.connection_manager.close()
+        
+        # Stop the pivot web server so its thread isn't destroyed while running
+        if self.web_server_thread is not None:
+            self.web_server_thread.stop()
+            self.web_server_thread.wait(2000)
+        
         # Close database connection
         if hasattr(self, 'connection') and self.connection:
             try:
@@ -5123,103 +5685,193 @@ SHOW TABLES;
             except Exception as e:
                 print(f"Error closing database connection: {e}")
         
-        # Clean up temporary database file
+        # Clean up temporary database file off the GUI thread; the thread is not a daemon,
+        # so the process still waits for it after the window is gone
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+        temp_dir = os.path.join(app_dir, 'temp')
+        db_file = os.path.join(temp_dir, 'duckdb_gui_temp.duckdb')
+        wal_file = os.path.join(temp_dir, 'duckdb_gui_temp.duckdb.wal')
+        threading.Thread(target=self._cleanup_temp_files, args=(db_file, wal_file, temp_dir), daemon=False).start()
+        
+        event.accept()
+    
+    @staticmethod
+    def _cleanup_temp_files(db_file: str, wal_file: str, temp_dir: str):
+        """Delete the temporary database, its WAL and the temp directory if it is left empty"""
+        removed = []
         try:
-            import os
-            app_dir = os.path.dirname(os.path.abspath(__file__))
-            temp_dir = os.path.join(app_dir, 'temp')
-            db_file = os.path.join(temp_dir, 'duckdb_gui_temp.duckdb')
-            wal_file = os.path.join(temp_dir, 'duckdb_gui_temp.duckdb.wal')
-            
-            # Remove database files if they exist
-            if os.path.exists(db_file):
-                os.remove(db_file)
-                print(f"Temporary database file deleted: {db_file}")
-            
-            if os.path.exists(wal_file):
-                os.remove(wal_file)
-                print(f"Temporary WAL file deleted: {wal_file}")
-            
-            # Remove temp directory if empty
-            if os.path.exists(temp_dir) and not os.listdir(temp_dir):
-                os.rmdir(temp_dir)
-                print("Temporary directory removed")
+            # Remove database files; a file that is already gone is fine
+            for path in (db_file, wal_file):
+                with suppress(FileNotFoundError):
+                    os.unlink(path)
+                    removed.append(path)
+            
+            # Remove temp directory if empty; scandir stops at the first entry
+            with suppress(FileNotFoundError):
+                with os.scandir(temp_dir) as entries:
+                    empty = next(entries, None) is None
+                if empty:
+                    os.rmdir(temp_dir)
+                    removed.append(temp_dir)
                 
         except Exception as e:
             print(f"Error cleaning up temporary files: {e}")
         
-        # Save settings
-        try:
-            settings = QSettings()
-            settings.sync()
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-        
-        event.accept()
+        if removed:
+            print(f"Temporary files removed: {', '.join(removed)}")
     
     def setup_web_server(self):
         """Initialize Flask web server for PivotJS visualization"""
+        # Flask is only imported once a pivot is opened, keeping it off the startup path
+        from flask import Flask, Response, jsonify, request, send_from_directory
+        
         self.flask_app = Flask(__name__, static_folder='static')
-        self.web_server_port = 5000
+        
+        def results_for(tab_index, version=None):
+            """Return a tab's results_data under the results lock; the server handles requests on several threads"""
+            with self._results_lock:
+                results_data = self.query_results_tables.get(tab_index)
+            if version is not None and (results_data is None or results_data['version'] != version):
+                # The results were replaced after the request looked them up; don't cache the new ones under the old key
+                raise LookupError('Results changed, please retry')
+            return results_data
         
         # Configure Flask routes
         @self.flask_app.route('/pivot')
         def pivot_page():
-            return send_from_directory('static', 'pivot.html')
+            # The page is static; send_from_directory adds an ETag and answers If-None-Match with 304
+            return send_from_directory('static', 'pivot.html', max_age=3600)
+        
+        @self.flask_app.after_request
+        def no_store_api(response):
+            # Results change with every query, so API responses must never come from a browser cache
+            if request.path.startswith('/api/'):
+                response.headers['Cache-Control'] = 'no-store'
+            return response
+        
+        @functools.lru_cache(maxsize=16)
+        def build_pivot_payload(tab_index, version, tab_name):
+            """Serialize a tab's results for PivotJS; keyed on the results version so replaced results miss"""
+            results_data = results_for(tab_index, version)
+            
+            # Convert data to list of dictionaries for PivotJS; short rows are padded with None
+            cols = tuple(results_data['columns'])
+            width = len(cols)
+            pivot_data = [
+                dict(zip(cols, row if len(row) >= width else tuple(row) + (None,) * (width - len(row))))
+                for row in iter_result_rows(results_data['data'])
+            ]
+            
+            return self.flask_app.json.dumps({
+                'success': True,
+                'data': pivot_data,
+                'query_info': {
+                    'tab_name': tab_name,
+                    'query': results_data.get('query', ''),
+                    'total_count': results_data.get('total_count', len(pivot_data))
+                }
+            })
+        
+        @functools.lru_cache(maxsize=16)
+        def build_pivot_arrow(tab_index, version):
+            """Serialize a tab's results as an Arrow IPC stream, column by column"""
+            results_data = results_for(tab_index, version)
+            table = results_data['data']
+            if not isinstance(table, pa.Table):
+                table = pa.table(dict(zip(results_data['columns'], result_columns(table))))
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+        
+        # The fixed error bodies are serialized once; responses are still built per request
+        # because after_request adds headers to them
+        error_bodies = {
+            message: json.dumps({'success': False, 'error': message})
+            for message in ('No tab_id provided', 'Invalid tab_id format', 'Tab not found', 'No data available for this tab')
+        }
+        
+        def error_response(message, status=200):
+            return Response(error_bodies[message], status=status, mimetype='application/json')
         
         @self.flask_app.route('/api/pivot-data')
         def get_pivot_data():
             try:
                 tab_id = request.args.get('tab_id')
                 if not tab_id:
-                    return jsonify({'success': False, 'error': 'No tab_id provided'})
+                    return error_response('No tab_id provided')
                 
                 try:
                     tab_index = int(tab_id)
                 except ValueError:
-                    return jsonify({'success': False, 'error': 'Invalid tab_id format'})
+                    return error_response('Invalid tab_id format')
                 
                 # Get results data for the specified tab
-                if tab_index not in self.query_results_tables:
-                    return jsonify({'success': False, 'error': 'Tab not found'})
-                
-                results_data = self.query_results_tables[tab_index]
+                results_data = results_for(tab_index)
+                if results_data is None:
+                    return error_response('Tab not found')
                 
-                if not results_data['data'] or not results_data['columns']:
-                    return jsonify({'success': False, 'error': 'No data available for this tab'})
+                if len(results_data['data']) == 0 or not results_data['columns']:
+                    return error_response('No data available for this tab')
                 
-                # Convert data to list of dictionaries for PivotJS
-                pivot_data = []
-                for row in results_data['data']:
-                    row_dict = {}
-                    for i, col_name in enumerate(results_data['columns']):
-                        if i < len(row):
-                            row_dict[col_name] = row[i]
-                        else:
-                            row_dict[col_name] = None
-                    pivot_data.append(row_dict)
-                
-                # Get query tab name
-                tab_name = self.query_tabs.tabText(tab_index) if tab_index < self.query_tabs.count() else f"Query {tab_index + 1}"
+                # The tab name is stored with the results, so the server thread never touches the widgets
+                tab_name = results_data.get('tab_name') or f"Query {tab_index + 1}"
                 
-                return jsonify({
-                    'success': True,
-                    'data': pivot_data,
-                    'query_info': {
-                        'tab_name': tab_name,
-                        'query': results_data.get('query', ''),
-                        'total_count': results_data.get('total_count', len(pivot_data))
-                    }
-                })
+                # Repeated requests for the same results reuse the serialized payload
+                payload = build_pivot_payload(tab_index, results_data['version'], tab_name)
+                return Response(payload, mimetype='application/json')
                 
             except Exception as e:
                 return jsonify({'success': False, 'error': str(e)})
         
-        # Start Flask server in a separate thread
-        def run_server():
-            self.flask_app.run(host='127.0.0.1', port=self.web_server_port, debug=False, use_reloader=False)
+        @self.flask_app.route('/api/pivot-data.arrow')
+        def get_pivot_data_arrow():
+            """Columnar variant of /api/pivot-data for front-ends that read Arrow (e.g. arrow-js)"""
+            try:
+                tab_index = int(request.args.get('tab_id', ''))
+            except ValueError:
+                return error_response('Invalid tab_id format', 400)
+            
+            results_data = results_for(tab_index)
+            if results_data is None:
+                return error_response('Tab not found', 404)
+            
+            if len(results_data['data']) == 0 or not results_data['columns']:
+                return error_response('No data available for this tab', 404)
+            
+            try:
+                payload = build_pivot_arrow(tab_index, results_data['version'])
+            except Exception as e:
+                return jsonify({'success': False, 'error': str(e)}), 500
+            return Response(payload, mimetype='application/vnd.apache.arrow.stream')
+        
+        # Bind to a port the OS picks, so another program on 5000 can't keep the server from starting
+        try:
+            # waitress handles requests on a thread pool, so the pivot page and its API calls don't queue
+            from waitress import create_server
+        except ImportError:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, self.flask_app, threaded=True)
+            self.web_server_port = server.server_port
+            run_server, stop_server = server.serve_forever, server.shutdown
+        else:
+            from waitress import wasyncore
+            # Hand waitress a socket map of our own so shutdown can close its channels without private attributes
+            socket_map = {}
+            server = create_server(self.flask_app, map=socket_map, host='127.0.0.1', port=0, threads=4)
+            self.web_server_port = server.effective_port
+            
+            def stop_server():
+                # Closing every channel empties the loop's map, which ends server.run()
+                server.close()
+                wasyncore.close_all(socket_map)
+                server.task_dispatcher.shutdown()
+            
+            run_server = server.run
         
-        self.web_server_thread = threading.Thread(target=run_server, daemon=True)
+        # Start Flask server in a separate thread
+        self.web_server_thread = WebServerWorker(run_server, stop_server)
+        self.web_server_thread.error.connect(self.log_message)
         self.web_server_thread.start()
         print(f"Web server started on http://127.0.0.1:{self.web_server_port}")
     
@@ -5237,14 +5889,26 @@ SHOW TABLES;
             return
         
         results_data = self.query_results_tables[current_tab_index]
-        if not results_data['data'] or not results_data['columns']:
+        if len(results_data['data']) == 0 or not results_data['columns']:
             QMessageBox.warning(self, "Warning", "No data available for visualization. Please run a query first.")
             return
         
+        # Start the web server the first time a pivot is opened
+        if self.flask_app is None:
+            try:
+                self.setup_web_server()
+            except Exception as e:
+                self.flask_app = None
+                QMessageBox.critical(self, "Error", f"Failed to start web server: {str(e)}")
+                self.log_message(f"Error starting web server: {str(e)}")
+                return
+        
         # Open browser with PivotJS visualization
         url = f"http://127.0.0.1:{self.web_server_port}/pivot?tab_id={current_tab_index}"
         try:
-            webbrowser.open(url)
+            # Hand the URL to the platform's handler; webbrowser is only the fallback
+            if not QDesktopServices.openUrl(QUrl(url)):
+                webbrowser.open(url)
             self.log_message(f"Opened PivotJS visualization: {url}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to open browser: {str(e)}")